@@ -4,17 +4,17 @@ Analyzer — main AI pipeline for a single job application.
 Flow triggered by CMD_ANALYZE_JOB:
   1. Fetch application + job_feed + profile from PostgreSQL
   2. Compute MatchScore (keyword-based, deterministic)
-  3. LLM: generate Pros/Cons
-  4. LLM: generate cover letter
-  5. LLM: generate ATS CV suggestions
+  3-5. LLM (concurrently): Pros/Cons, cover letter, ATS CV suggestions
   6. Write ai_analysis + generated_cover_letter to applications table
   7. Publish EVENT_ANALYSIS_DONE to Redis → Gateway → SSE → client
 """
 
-import json
+import asyncio
 import logging
 from datetime import UTC, datetime
 
+import orjson
+
 import llm
 import match_score as ms
 import prompts
@@ -22,6 +22,45 @@ from database import get_pool
 
 logger = logging.getLogger(__name__)
 
+# Constant SQL texts: asyncpg caches the prepared statement per connection
+# keyed on the query string, so each pooled connection parses/plans these once.
+#
+# Only the raw_data keys the pipeline reads are shipped back: Adzuna payloads
+# carry dozens of unused fields (redirect URLs, locations, categories…).
+# The description is kept whole because MatchScore tokenises all of it.
+_FETCH_SQL = """
+    SELECT
+        jsonb_strip_nulls(jsonb_build_object(
+            'title',        jf.raw_data->'title',
+            'poste',        jf.raw_data->'poste',
+            'company_name', jf.raw_data->'company_name',
+            'company',      jf.raw_data->'company',
+            'entreprise',   jf.raw_data->'entreprise',
+            'description',  jf.raw_data->'description',
+            'contractType', jf.raw_data->'contractType'
+        ))                 AS job_raw_data,
+        p.full_name,
+        p.updated_at       AS profile_updated_at,
+        p.skills_json      AS skills,
+        p.experience_json  AS experience,
+        COALESCE(sc.cover_letter_template, '') AS cover_letter_template
+    FROM applications a
+    JOIN job_feed jf   ON jf.id = a.job_feed_id
+    JOIN profiles p    ON p.user_id = a.user_id
+    LEFT JOIN search_configs sc ON sc.id = jf.search_config_id
+    WHERE a.id = $1 AND a.user_id = $2
+"""
+
+_UPDATE_SQL = """
+    UPDATE applications
+    SET
+        ai_analysis            = $1::jsonb,
+        generated_cover_letter = $2,
+        updated_at             = NOW()
+    WHERE id = $3
+    RETURNING id
+"""
+
 
 async def analyze(application_id: str, user_id: str, rdb) -> None:
     """
@@ -37,22 +76,7 @@ async def analyze(application_id: str, user_id: str, rdb) -> None:
     # ── 1. Fetch all required data in one query ─────────────────
     async with pool.acquire() as conn:
         row = await conn.fetchrow(
-            """
-            SELECT
-                a.id               AS app_id,
-                a.user_id,
-                jf.raw_data        AS job_raw_data,
-                jf.source_url      AS job_url,
-                p.full_name,
-                p.skills_json      AS skills,
-                p.experience_json  AS experience,
-                COALESCE(sc.cover_letter_template, '') AS cover_letter_template
-            FROM applications a
-            JOIN job_feed jf   ON jf.id = a.job_feed_id
-            JOIN profiles p    ON p.user_id = a.user_id
-            LEFT JOIN search_configs sc ON sc.id = jf.search_config_id
-            WHERE a.id = $1 AND a.user_id = $2
-            """,
+            _FETCH_SQL,
             application_id,
             user_id,
         )
@@ -63,16 +87,10 @@ async def analyze(application_id: str, user_id: str, rdb) -> None:
         )
         return
 
-    # Deserialise JSONB fields
-    _raw = row["job_raw_data"]
-    if isinstance(_raw, dict):
-        raw_data: dict = _raw
-    elif _raw:
-        raw_data = json.loads(_raw)
-    else:
-        raw_data = {}
-    skills: list = _load_json(row["skills"])
-    experience: list = _load_json(row["experience"])
+    # JSONB fields arrive already decoded (codec registered in database.py)
+    raw_data: dict = row["job_raw_data"] or {}
+    skills: list = _as_list(row["skills"])
+    experience: list = _as_list(row["experience"])
 
     job_title: str = raw_data.get("title", raw_data.get("poste", "Unknown position"))
     company_raw = raw_data.get(
@@ -89,7 +107,8 @@ async def analyze(application_id: str, user_id: str, rdb) -> None:
         )
     else:
         company = str(company_raw or "Unknown company")
-    description: str = raw_data.get("description", "")
+    job = ms.JobContext.from_raw(raw_data)
+    description: str = job.description
     full_name: str = row["full_name"] or ""
     skills_flat: list[str] = _flatten_skills(skills)
     cover_letter_template: str = row["cover_letter_template"] or ""
@@ -99,32 +118,43 @@ async def analyze(application_id: str, user_id: str, rdb) -> None:
     )
 
     # ── 2. MatchScore (fast, synchronous) ──────────────────────
-    score = ms.compute(skills, experience, raw_data)
+    score = ms.compute(
+        skills, experience, job, profile_key=(user_id, row["profile_updated_at"])
+    )
     logger.info("MatchScore = %d/100", score)
 
-    # ── 3. LLM: Pros / Cons ────────────────────────────────────
+    # ── 3-5. LLM prompts (independent — built up front) ──────────
+    skills_csv = ", ".join(skills_flat)
+    experience_block = prompts.format_experience(experience)
     sys_p, usr_p = prompts.pros_cons_prompt(
-        job_title, description, company, skills_flat, experience, score
+        job_title, description, company, skills_csv, experience_block, score
     )
-    pros_cons = await llm.chat_json(sys_p, usr_p, temperature=0.3)
-    pros: list[str] = (pros_cons or {}).get("pros", [])
-    cons: list[str] = (pros_cons or {}).get("cons", [])
-
-    # ── 4. LLM: Cover Letter ───────────────────────────────────
     sys_cl, usr_cl = prompts.cover_letter_prompt(
         job_title,
         company,
         description,
         full_name,
-        skills_flat,
-        experience,
+        skills_csv,
+        experience_block,
         template=cover_letter_template,
     )
-    cover_letter: str | None = await llm.chat_text(sys_cl, usr_cl, temperature=0.7)
+    sys_cv, usr_cv = prompts.cv_suggestions_prompt(job_title, description, skills_csv)
+
+    # Pros/Cons, cover letter and CV suggestions run concurrently: latency is
+    # the slowest call rather than the sum. The overall ANALYSIS_TIMEOUT_SECONDS
+    # budget is still enforced by redis_consumer._safe_analyze.
+    pros_cons, cover_letter, cv_result = await asyncio.gather(
+        llm.chat_json(sys_p, usr_p, temperature=0.3),
+        llm.chat_text(sys_cl, usr_cl, temperature=0.7),
+        llm.chat_json(sys_cv, usr_cv, temperature=0.3),
+        return_exceptions=True,
+    )
+    pros_cons = _result_or_none(pros_cons, "pros/cons", application_id)
+    cover_letter = _result_or_none(cover_letter, "cover letter", application_id)
+    cv_result = _result_or_none(cv_result, "CV suggestions", application_id)
 
-    # ── 5. LLM: CV Suggestions ─────────────────────────────────
-    sys_cv, usr_cv = prompts.cv_suggestions_prompt(job_title, description, skills_flat)
-    cv_result = await llm.chat_json(sys_cv, usr_cv, temperature=0.3)
+    pros: list[str] = (pros_cons or {}).get("pros", [])
+    cons: list[str] = (pros_cons or {}).get("cons", [])
     cv_suggestions: list[str] = (cv_result or {}).get("suggestions", [])
 
     # ── 6. Write results to DB ─────────────────────────────────
@@ -136,25 +166,7 @@ async def analyze(application_id: str, user_id: str, rdb) -> None:
         "analyzed_at": datetime.now(UTC).isoformat(),
     }
 
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            UPDATE applications
-            SET
-                ai_analysis            = $1::jsonb,
-                generated_cover_letter = $2,
-                updated_at             = NOW()
-            WHERE id = $3
-            """,
-            json.dumps(ai_analysis),
-            cover_letter,
-            application_id,
-        )
-
-    logger.info("Analysis written to DB for application %s", application_id)
-
-    # ── 7. Publish EVENT_ANALYSIS_DONE ─────────────────────────
-    event_payload = json.dumps(
+    event_payload = orjson.dumps(
         {
             "type": "EVENT_ANALYSIS_DONE",
             "applicationId": application_id,
@@ -164,6 +176,26 @@ async def analyze(application_id: str, user_id: str, rdb) -> None:
             "analyzedAt": ai_analysis["analyzed_at"],
         }
     )
+
+    async with pool.acquire() as conn:
+        updated_id = await conn.fetchval(
+            _UPDATE_SQL,
+            ai_analysis,
+            cover_letter,
+            application_id,
+        )
+
+    if updated_id is None:
+        logger.warning(
+            "Application %s disappeared before analysis could be saved.",
+            application_id,
+        )
+        return
+    logger.info("Analysis written to DB for application %s", application_id)
+
+    # ── 7. Publish EVENT_ANALYSIS_DONE ─────────────────────────
+    # Only once the row is committed: the Gateway re-reads the application
+    # as soon as it sees the event.
     await rdb.publish("EVENT_ANALYSIS_DONE", event_payload)
     logger.info("EVENT_ANALYSIS_DONE published for application %s", application_id)
 
@@ -171,19 +203,32 @@ async def analyze(application_id: str, user_id: str, rdb) -> None:
 # ── Helpers ────────────────────────────────────────────────────
 
 
-def _load_json(value) -> list:
-    if value is None:
-        return []
-    if isinstance(value, list | dict):
-        return value if isinstance(value, list) else [value]
-    try:
-        return json.loads(value)
-    except (json.JSONDecodeError, TypeError):
-        return []
+def _result_or_none(result, label: str, application_id: str):
+    """Unwrap an asyncio.gather(return_exceptions=True) result, logging failures."""
+    if isinstance(result, BaseException):
+        if not isinstance(result, Exception):
+            raise result
+        logger.error(
+            "LLM %s failed for application %s: %s", label, application_id, result
+        )
+        return None
+    return result
+
+
+def _as_list(value) -> list:
+    """Coerce a decoded JSONB column to a list; a lone object becomes a one-item list."""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        return [value]
+    return []
 
 
 def _flatten_skills(skills: list) -> list[str]:
     """Normalise skills to a flat list of strings."""
+    # Plain string lists (already flat) are returned as-is, without a copy
+    if all(isinstance(s, str) for s in skills):
+        return skills
     result = []
     for s in skills:
         if isinstance(s, str):
@@ -0,0 +1,92 @@
+"""
+Redis-backed cache for LLM responses.
+
+Keys are a hash of (kind, model, system prompt, normalised user prompt,
+temperature). Normalisation only removes differences that cannot change the
+model's answer — runs of whitespace and blank lines — so two prompts that
+differ in any real content (candidate name, CV text, job description…)
+never share an entry. Values are zlib-compressed JSON.
+
+The Redis client is installed once at startup via init(); until then (and
+when LLM_CACHE_TTL_SECONDS is 0) every lookup is a miss and writes are
+skipped. Redis errors and unreadable entries are logged and treated as
+misses.
+"""
+
+import hashlib
+import logging
+import re
+import zlib
+from typing import Any
+
+import orjson
+import redis.asyncio as aioredis
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "ai:v2"
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_rdb: aioredis.Redis | None = None
+
+
+def init(rdb: aioredis.Redis | None) -> None:
+    """Install (or, with None, remove) the Redis client used by the cache."""
+    global _rdb
+    _rdb = rdb
+
+
+def _enabled() -> bool:
+    return _rdb is not None and config.LLM_CACHE_TTL_SECONDS > 0
+
+
+def normalize(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def make_key(kind: str, system: str, user: str, temperature: float) -> str:
+    material = "\x00".join(
+        (config.OPENROUTER_MODEL, system, normalize(user), str(temperature))
+    )
+    digest = hashlib.sha256(material.encode()).hexdigest()
+    return f"{_KEY_PREFIX}:{kind}:{digest}"
+
+
+async def get(key: str) -> Any:
+    if not _enabled():
+        return None
+    try:
+        cached = await _rdb.get(key)
+    except Exception as exc:
+        logger.warning("LLM cache read failed: %s", exc)
+        return None
+    if cached is None:
+        return None
+    try:
+        value = orjson.loads(zlib.decompress(cached))
+    except (zlib.error, orjson.JSONDecodeError) as exc:
+        # Corrupt or old-format entry: treat as a miss and drop it so the
+        # next put() replaces it
+        logger.warning("LLM cache entry unreadable (%s): %s", key, exc)
+        try:
+            await _rdb.delete(key)
+        except Exception as del_exc:
+            logger.warning("LLM cache delete failed: %s", del_exc)
+        return None
+    logger.info("LLM cache hit (%s)", key)
+    return value
+
+
+async def put(key: str, value: Any) -> None:
+    if not _enabled() or not value:
+        return
+    try:
+        await _rdb.set(
+            key,
+            zlib.compress(orjson.dumps(value)),
+            ex=config.LLM_CACHE_TTL_SECONDS,
+        )
+    except Exception as exc:
+        logger.warning("LLM cache write failed: %s", exc)
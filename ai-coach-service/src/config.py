@@ -32,6 +32,12 @@ DATABASE_URL: str = _require("DATABASE_URL")
 
 # ── Redis ──────────────────────────────────────────────────────
 REDIS_URL: str = _require("REDIS_URL")
+# Connections per Redis client; callers wait for a free one beyond this.
+REDIS_POOL_SIZE: int = _optional_int("REDIS_POOL_SIZE", 10)
+# A command left unacknowledged this long (its consumer died or was replaced
+# on redeploy) is claimed by another worker. Must exceed the longest a job can
+# wait for a slot plus ANALYSIS_TIMEOUT_SECONDS, or live jobs get run twice.
+STREAM_CLAIM_IDLE_SECONDS: int = _optional_int("STREAM_CLAIM_IDLE_SECONDS", 600)
 
 # ── OpenRouter ─────────────────────────────────────────────────
 OPENROUTER_API_KEY: str = _optional("OPENROUTER_API_KEY")
@@ -43,6 +49,19 @@ OPENROUTER_MODEL: str = _optional(
 )
 OPENROUTER_TIMEOUT_SECONDS: int = _optional_int("OPENROUTER_TIMEOUT_SECONDS", 45)
 ANALYSIS_TIMEOUT_SECONDS: int = _optional_int("ANALYSIS_TIMEOUT_SECONDS", 120)
+# Redis cache for LLM responses (see cache.py). 0 disables.
+LLM_CACHE_TTL_SECONDS: int = _optional_int("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600)
+
+# ── Worker concurrency ─────────────────────────────────────────
+# Upper bound on analyses / CV parses running at the same time, so a burst
+# of commands cannot starve the asyncpg pool or flood OpenRouter.
+MAX_CONCURRENT_JOBS: int = _optional_int("MAX_CONCURRENT_JOBS", 8)
+
+# ── CV parse batching ──────────────────────────────────────────
+# CVs arriving within the window are sent to the LLM in one prompt
+# (up to CV_BATCH_MAX_SIZE CVs). A window of 0 disables batching.
+CV_BATCH_WINDOW_MS: int = _optional_int("CV_BATCH_WINDOW_MS", 500)
+CV_BATCH_MAX_SIZE: int = _optional_int("CV_BATCH_MAX_SIZE", 4)
 
 # ── Service ────────────────────────────────────────────────────
 AI_COACH_PORT: int = int(_optional("AI_COACH_PORT", "8083"))
@@ -3,12 +3,14 @@ CV Parser — AI Coach pipeline for CMD_PARSE_CV.
 
 Flow:
   1. Read PDF bytes from disk (path provided in message payload)
-  2. Extract raw text using pdfminer.six
+  2. Extract raw text using pypdfium2 (PDFium bindings)
   3. Call LLM to extract structured profile fields:
        skills_json, experience_json, education_json,
        certifications_json, projects_json
+     CVs arriving close together are batched into a single LLM prompt
+     (see CvBatcher) and the results demultiplexed back per user.
   4. PATCH the profiles table (only non-empty fields are overwritten)
-  5. Publish EVENT_CV_PARSED → Gateway SSE → client
+  5. Publish EVENT_CV_PARSED → Gateway SSE → client (once 4 has succeeded)
 
 Expected CMD_PARSE_CV payload:
   { "userId": "<uuid>", "cvUrl": "<relative-path e.g. /uploads/abc.pdf>" }
@@ -16,14 +18,18 @@ Expected CMD_PARSE_CV payload:
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 import os
+import threading
+from concurrent.futures import Executor
 
+import orjson
+import pypdfium2 as pdfium
 import redis.asyncio as aioredis
-from pdfminer.high_level import extract_text
 
 import llm
+from config import CV_BATCH_MAX_SIZE, CV_BATCH_WINDOW_MS
 from database import get_pool
 
 logger = logging.getLogger(__name__)
@@ -32,6 +38,31 @@ logger = logging.getLogger(__name__)
 # In production both services share the cv_uploads Docker volume.
 UPLOAD_BASE = os.getenv("UPLOAD_DIR", "/app/uploads")
 
+# Hard cap on a single CV's text sent to the LLM.
+MAX_CV_CHARS = 8000
+# Combined CV text per batched prompt (~6k input tokens).
+MAX_BATCH_CHARS = 24000
+
+# Executor for PDF text extraction, installed at startup via init().
+# PDFium is not thread-safe and extraction is CPU-bound, so production uses a
+# process pool; until then the loop's default executor is used.
+_pdf_executor: Executor | None = None
+# PDFium may only be entered by one thread per process at a time. In the
+# process pool each worker is single-threaded and the lock is uncontended;
+# with the default thread executor it serialises concurrent extractions.
+_pdfium_lock = threading.Lock()
+
+
+def init(pdf_executor: Executor | None) -> None:
+    """Install (or, with None, remove) the executor used for PDF extraction."""
+    global _pdf_executor
+    _pdf_executor = pdf_executor
+
+
+async def close() -> None:
+    """Cancel batched CV extractions still in flight (call on shutdown)."""
+    await _batcher.aclose()
+
 
 # ─── Public entry point ───────────────────────────────────────────────────────
 
@@ -58,7 +89,10 @@ async def parse(user_id: str, cv_url: str, rdb: aioredis.Redis) -> None:
 
     # ── 2. Extract text from PDF ───────────────────────────────
     try:
-        text = extract_text(file_path)
+        # Text extraction is CPU-bound — keep it off the event loop
+        text = await asyncio.get_running_loop().run_in_executor(
+            _pdf_executor, extract_text, file_path
+        )
     except Exception as exc:
         logger.error("PDF extraction failed for %s: %s", file_path, exc)
         await _publish_error(rdb, user_id, f"PDF extraction failed: {exc}")
@@ -69,12 +103,11 @@ async def parse(user_id: str, cv_url: str, rdb: aioredis.Redis) -> None:
         await _publish_error(rdb, user_id, "No readable text found in PDF")
         return
 
-    text = text[:8000]  # cap to keep LLM context manageable
+    text = text[:MAX_CV_CHARS]  # cap to keep LLM context manageable
     logger.info("Extracted %d chars from CV for user %s", len(text), user_id)
 
     # ── 3. LLM: extract structured profile ────────────────────
-    sys_p, usr_p = _cv_extract_prompt(text)
-    parsed = await llm.chat_json(sys_p, usr_p, temperature=0.1)
+    parsed = await _batcher.extract(text)
 
     if not parsed:
         logger.error("LLM returned empty response for user %s CV", user_id)
@@ -87,36 +120,25 @@ async def parse(user_id: str, cv_url: str, rdb: aioredis.Redis) -> None:
     certifications = parsed.get("certifications") or []
     projects = parsed.get("projects") or []
 
-    # ── 4. Write back to profiles table ───────────────────────
-    pool = get_pool()
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            UPDATE profiles SET
-                skills_json          = CASE WHEN $1::jsonb != '[]'::jsonb
-                                            THEN $1::jsonb ELSE skills_json END,
-                experience_json      = CASE WHEN $2::jsonb != '[]'::jsonb
-                                            THEN $2::jsonb ELSE experience_json END,
-                education_json       = CASE WHEN $3::jsonb != '[]'::jsonb
-                                            THEN $3::jsonb ELSE education_json END,
-                certifications_json  = CASE WHEN $4::jsonb != '[]'::jsonb
-                                            THEN $4::jsonb ELSE certifications_json END,
-                projects_json        = CASE WHEN $5::jsonb != '[]'::jsonb
-                                            THEN $5::jsonb ELSE projects_json END,
-                updated_at           = NOW()
-            WHERE user_id = $6
-            """,
-            json.dumps(skills),
-            json.dumps(experience),
-            json.dumps(education),
-            json.dumps(certifications),
-            json.dumps(projects),
-            user_id,
-        )
-    logger.info("Profile enriched from CV for user %s", user_id)
+    # Only non-empty sections are written; the others are left untouched.
+    sets: list[str] = []
+    values: list = []
+    for column, value in (
+        ("skills_json", skills),
+        ("experience_json", experience),
+        ("education_json", education),
+        ("certifications_json", certifications),
+        ("projects_json", projects),
+    ):
+        if value:
+            values.append(value)
+            sets.append(f"{column} = ${len(values)}::jsonb")
+    sets.append("updated_at = NOW()")
+    update_sql = (
+        f"UPDATE profiles SET {', '.join(sets)} WHERE user_id = ${len(values) + 1}"
+    )
 
-    # ── 5. Publish EVENT_CV_PARSED ─────────────────────────────
-    event = json.dumps(
+    event = orjson.dumps(
         {
             "type": "EVENT_CV_PARSED",
             "userId": user_id,
@@ -129,6 +151,14 @@ async def parse(user_id: str, cv_url: str, rdb: aioredis.Redis) -> None:
             },
         }
     )
+
+    # ── 4. Write back to profiles table ───────────────────────
+    pool = get_pool()
+    async with pool.acquire() as conn:
+        await conn.execute(update_sql, *values, user_id)
+    logger.info("Profile enriched from CV for user %s", user_id)
+
+    # ── 5. Publish EVENT_CV_PARSED (only after the write succeeded) ─
     await rdb.publish("EVENT_CV_PARSED", event)
     logger.info("EVENT_CV_PARSED published for user %s", user_id)
 
@@ -136,33 +166,186 @@ async def parse(user_id: str, cv_url: str, rdb: aioredis.Redis) -> None:
 # ─── Prompt ───────────────────────────────────────────────────────────────────
 
 
+_CV_SCHEMA = (
+    "{\n"
+    '  "skills": [{"name": "string", "level": "beginner|intermediate|expert"}],\n'
+    '  "experience": [{"title": "string", "company": "string", "start": "YYYY-MM", '
+    '"end": "YYYY-MM or present", "description": "string"}],\n'
+    '  "education": [{"degree": "string", "school": "string", "year": 2024}],\n'
+    '  "certifications": [{"name": "string", "issuer": "string", "year": 2024}],\n'
+    '  "projects": [{"name": "string", "description": "string", "technologies": ["string"]}]\n'
+    "}\n"
+)
+
+_CV_RULES = (
+    "Rules:\n"
+    "- Infer skill levels from context (years, job titles, project complexity).\n"
+    "- Use empty arrays [] for sections absent from the CV.\n"
+    "- Do NOT include any text outside the JSON object.\n"
+    "- Dates: use YYYY-MM format; use 'present' for current roles."
+)
+
+
+_CV_EXTRACT_SYSTEM = (
+    "You are an expert HR data extractor. Parse the following CV/résumé text and "
+    "return ONLY a valid JSON object with these exact keys:\n" + _CV_SCHEMA + _CV_RULES
+)
+
+_CV_BATCH_EXTRACT_SYSTEM = (
+    "You are an expert HR data extractor. You will receive several numbered, "
+    "independent CV/résumé texts. Parse each one and return ONLY a valid JSON "
+    'object of the form {"cvs": [...]} where "cvs" holds exactly one object per '
+    "CV, in the same order as the input. Each object has these exact keys:\n"
+    + _CV_SCHEMA
+    + _CV_RULES
+    + "\n- Never mix information between CVs."
+)
+
+
 def _cv_extract_prompt(cv_text: str) -> tuple[str, str]:
-    system = (
-        "You are an expert HR data extractor. Parse the following CV/résumé text and "
-        "return ONLY a valid JSON object with these exact keys:\n"
-        "{\n"
-        '  "skills": [{"name": "string", "level": "beginner|intermediate|expert"}],\n'
-        '  "experience": [{"title": "string", "company": "string", "start": "YYYY-MM", '
-        '"end": "YYYY-MM or present", "description": "string"}],\n'
-        '  "education": [{"degree": "string", "school": "string", "year": 2024}],\n'
-        '  "certifications": [{"name": "string", "issuer": "string", "year": 2024}],\n'
-        '  "projects": [{"name": "string", "description": "string", "technologies": ["string"]}]\n'
-        "}\n"
-        "Rules:\n"
-        "- Infer skill levels from context (years, job titles, project complexity).\n"
-        "- Use empty arrays [] for sections absent from the CV.\n"
-        "- Do NOT include any text outside the JSON object.\n"
-        "- Dates: use YYYY-MM format; use 'present' for current roles."
+    return _CV_EXTRACT_SYSTEM, f"CV text:\n\n{cv_text}"
+
+
+def _cv_batch_extract_prompt(cv_texts: list[str]) -> tuple[str, str]:
+    user = "\n\n".join(
+        f"=== CV {i} ===\n{text}" for i, text in enumerate(cv_texts, start=1)
     )
-    user = f"CV text:\n\n{cv_text}"
-    return system, user
+    return _CV_BATCH_EXTRACT_SYSTEM, user
+
+
+# ─── Batching ─────────────────────────────────────────────────────────────────
+
+
+class CvBatcher:
+    """
+    Coalesces CV extraction requests that arrive within `window` seconds
+    into a single multi-CV LLM prompt, then hands each caller its own result.
+
+    A batch is flushed when the window elapses, when it reaches `max_size`
+    CVs, or before it would exceed `max_chars` of combined text. A batch of
+    one uses the regular single-CV prompt; a malformed multi-CV response
+    falls back to one call per CV.
+    """
+
+    def __init__(self, window: float, max_size: int, max_chars: int) -> None:
+        self._window = window
+        self._max_size = max_size
+        self._max_chars = max_chars
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._pending_chars = 0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def aclose(self) -> None:
+        """Cancel the pending batch and any in-flight LLM calls."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for _, future in self._pending:
+            future.cancel()
+        self._pending, self._pending_chars = [], 0
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def extract(self, cv_text: str) -> dict | None:
+        if self._window <= 0 or self._max_size <= 1:
+            return await _extract_one(cv_text)
+
+        loop = asyncio.get_running_loop()
+        if self._pending and self._pending_chars + len(cv_text) > self._max_chars:
+            self._flush()
+
+        future = loop.create_future()
+        self._pending.append((cv_text, future))
+        self._pending_chars += len(cv_text)
+
+        if len(self._pending) >= self._max_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending, self._pending_chars = self._pending, [], 0
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            if len(texts) == 1:
+                results = [await _extract_one(texts[0])]
+            else:
+                results = await _extract_many(texts)
+        except Exception as exc:
+            logger.error("CV batch extraction failed: %s", exc)
+            results = [None] * len(batch)
+
+        for (_, future), result in zip(batch, results, strict=True):
+            if not future.done():
+                future.set_result(result)
+
+
+async def _extract_one(cv_text: str) -> dict | None:
+    sys_p, usr_p = _cv_extract_prompt(cv_text)
+    return await llm.chat_json(sys_p, usr_p, temperature=0.1)
+
+
+async def _extract_many(cv_texts: list[str]) -> list[dict | None]:
+    sys_p, usr_p = _cv_batch_extract_prompt(cv_texts)
+    parsed = await llm.chat_json(sys_p, usr_p, temperature=0.1)
+    items = (parsed or {}).get("cvs")
+    if (
+        isinstance(items, list)
+        and len(items) == len(cv_texts)
+        and all(isinstance(item, dict) for item in items)
+    ):
+        logger.info("Parsed %d CVs in a single LLM call", len(cv_texts))
+        return items
+
+    logger.warning(
+        "Batched CV response malformed — retrying %d CVs individually", len(cv_texts)
+    )
+    return list(await asyncio.gather(*(_extract_one(text) for text in cv_texts)))
+
+
+_batcher = CvBatcher(
+    window=CV_BATCH_WINDOW_MS / 1000,
+    max_size=CV_BATCH_MAX_SIZE,
+    max_chars=MAX_BATCH_CHARS,
+)
 
 
 # ─── Helpers ─────────────────────────────────────────────────────────────────
 
 
+def extract_text(file_path: str) -> str:
+    """Extract the text of every page of a PDF, one page per paragraph."""
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            pages = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_bounded())
+                textpage.close()
+                page.close()
+            return "\n".join(pages)
+        finally:
+            pdf.close()
+
+
 async def _publish_error(rdb: aioredis.Redis, user_id: str, reason: str) -> None:
-    event = json.dumps(
+    event = orjson.dumps(
         {
             "type": "EVENT_CV_PARSED",
             "userId": user_id,
@@ -6,6 +6,7 @@ The pool is created once at startup and shared across all coroutines.
 import logging
 
 import asyncpg
+import orjson
 
 from config import DATABASE_URL
 
@@ -14,14 +15,42 @@ logger = logging.getLogger(__name__)
 _pool: asyncpg.Pool | None = None
 
 
+def _encode_jsonb(value) -> bytes:
+    # Binary JSONB wire format: 1-byte version header followed by JSON text
+    return b"\x01" + orjson.dumps(value)
+
+
+def _decode_jsonb(data: bytes):
+    return orjson.loads(data[1:])
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """Decode JSONB columns to Python objects and encode dict/list params directly."""
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=_encode_jsonb,
+        decoder=_decode_jsonb,
+        schema="pg_catalog",
+        format="binary",
+    )
+
+
 async def create_pool() -> asyncpg.Pool:
     global _pool
     logger.info("Connecting to PostgreSQL…")
     _pool = await asyncpg.create_pool(
         DATABASE_URL,
-        min_size=2,
-        max_size=10,
+        min_size=5,
+        max_size=20,
         command_timeout=30,
+        init=_init_connection,
+        # Every query this service runs is a constant SQL text (the CV
+        # parser's UPDATE has at most 32 column combinations), so the
+        # per-connection prepared-statement cache holds them all. Disable
+        # the default 300 s expiry so a quiet worker does not re-parse
+        # and re-plan its statements every few minutes.
+        statement_cache_size=100,
+        max_cached_statement_lifetime=0,
     )
     # Verify connectivity
     async with _pool.acquire() as conn:
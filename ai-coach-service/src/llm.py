@@ -1,14 +1,19 @@
 """
 OpenRouter LLM client (OpenAI-compatible API).
 Returns structured JSON for all generation tasks.
+
+Responses are cached in Redis (see cache.py), so a duplicate prompt skips
+the OpenRouter round-trip entirely.
 """
 
-import json
 import logging
 from typing import Any
 
-from openai import AsyncOpenAI
+import httpx
+import orjson
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
+import cache
 import config
 
 logger = logging.getLogger(__name__)
@@ -31,12 +36,29 @@ def get_client() -> AsyncOpenAI | None:
                 "HTTP-Referer": "https://api.meelkyway.com",
                 "X-Title": "JobMate AI Coach",
             },
+            # HTTP/2 + keep-alive: the analyzer's parallel calls are multiplexed
+            # over one TLS connection instead of opening one each.
+            http_client=DefaultAsyncHttpxClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+                timeout=config.OPENROUTER_TIMEOUT_SECONDS,
+            ),
         )
     return _client
 
 
+async def close_client() -> None:
+    """Close the shared HTTP connection pool (called on shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
 async def chat_json(
-    system: str, user: str, temperature: float = 0.4
+    system: str,
+    user: str,
+    temperature: float = 0.4,
 ) -> dict[str, Any] | None:
     """
     Call the LLM with a system + user prompt and parse the response as JSON.
@@ -45,41 +67,42 @@ async def chat_json(
         Parsed dict on success.
         None if no API key is set or the response cannot be parsed.
     """
-    client = get_client()
-    if client is None:
-        logger.warning("OPENROUTER_API_KEY not set — LLM generation skipped.")
-        return None
-
-    try:
-        response = await client.chat.completions.create(
-            model=config.OPENROUTER_MODEL,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            temperature=temperature,
-            timeout=config.OPENROUTER_TIMEOUT_SECONDS,
-            # Ask the model to return JSON — not all routed models support
-            # response_format natively, so we also enforce it in the prompts.
-            response_format={"type": "json_object"},
-        )
-        raw = response.choices[0].message.content or "{}"
-        return json.loads(raw)
-    except json.JSONDecodeError as exc:
-        logger.error("LLM returned non-JSON: %s", exc)
-        return None
-    except Exception as exc:
-        logger.error("LLM call failed: %s", exc)
-        return None
+    return await _chat(system, user, temperature=temperature, json_mode=True)
 
 
-async def chat_text(system: str, user: str, temperature: float = 0.7) -> str | None:
+async def chat_text(
+    system: str,
+    user: str,
+    temperature: float = 0.7,
+) -> str | None:
     """Call the LLM and return a plain text response."""
+    return await _chat(system, user, temperature=temperature, json_mode=False)
+
+
+async def _chat(
+    system: str,
+    user: str,
+    *,
+    temperature: float,
+    json_mode: bool,
+) -> Any:
+    """Shared request path: cache lookup, completion call, parsing, cache fill."""
     client = get_client()
     if client is None:
         logger.warning("OPENROUTER_API_KEY not set — LLM generation skipped.")
         return None
 
+    key = cache.make_key("json" if json_mode else "text", system, user, temperature)
+    cached = await cache.get(key)
+    if cached is not None:
+        return cached
+
+    extra: dict[str, Any] = {}
+    if json_mode:
+        # Ask the model to return JSON — not all routed models support
+        # response_format natively, so we also enforce it in the prompts.
+        extra["response_format"] = {"type": "json_object"}
+
     try:
         response = await client.chat.completions.create(
             model=config.OPENROUTER_MODEL,
@@ -89,8 +112,19 @@ async def chat_text(system: str, user: str, temperature: float = 0.7) -> str | N
             ],
             temperature=temperature,
             timeout=config.OPENROUTER_TIMEOUT_SECONDS,
+            **extra,
         )
-        return (response.choices[0].message.content or "").strip()
+        content = response.choices[0].message.content
+        if json_mode:
+            result = orjson.loads(content or "{}")
+        else:
+            result = (content or "").strip()
+    except orjson.JSONDecodeError as exc:
+        logger.error("LLM returned non-JSON: %s", exc)
+        return None
     except Exception as exc:
         logger.error("LLM call failed: %s", exc)
         return None
+
+    await cache.put(key, result)
+    return result
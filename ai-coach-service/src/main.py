@@ -4,8 +4,8 @@ jobmate-ai-coach-service — Phase 3
 Startup sequence:
   1. Validate required environment variables (config.py — fail-fast)
   2. Open asyncpg connection pool (database.py)
-  3. Open Redis async connection (redis_consumer.py)
-  4. Spawn Redis subscriber as a background task (redis_consumer.py)
+  3. Open Redis async connections — consumer + publisher (redis_consumer.py)
+  4. Spawn the Redis stream consumer as a background task (redis_consumer.py)
   5. Expose /health endpoint
 
 On CMD_ANALYZE_JOB:
@@ -16,7 +16,7 @@ On CMD_ANALYZE_JOB:
   - Publish EVENT_ANALYSIS_DONE for the Gateway SSE stream
 
 On CMD_PARSE_CV:
-  - Extract text from uploaded PDF using pdfminer.six
+  - Extract text from uploaded PDF using pypdfium2
   - Call LLM to extract skills, experience, education, certifications, projects
   - PATCH the profiles table with the extracted structured data
   - Publish EVENT_CV_PARSED for the Gateway SSE stream
@@ -25,12 +25,18 @@ On CMD_PARSE_CV:
 import asyncio
 import logging
 import logging.config
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from pythonjsonlogger import jsonlogger
 
+import cache
+import cv_parser
 import database
+import llm
 import redis_consumer
 from config import AI_COACH_PORT, SERVICE_VERSION
 
@@ -59,12 +65,24 @@ async def lifespan(application: FastAPI):
     # ── Startup ───────────────────────────────────────────────────────────────
     logger.info("ai-coach-service %s starting…", SERVICE_VERSION)
 
+    # PDF text extraction is CPU-bound and PDFium is not thread-safe, so it
+    # runs in worker processes rather than threads. "spawn" avoids forking a
+    # process that already has the event loop and its connections open.
+    pdf_pool = ProcessPoolExecutor(
+        max_workers=os.cpu_count() or 4,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    cv_parser.init(pdf_pool)
+
     await database.create_pool()
 
     rdb = await redis_consumer.create_redis_client()
+    # Separate client for EVENT_* publishes so they never queue behind the stream reads
+    pub_rdb = await redis_consumer.create_redis_client("publisher")
+    cache.init(pub_rdb)
 
     consumer_task = asyncio.create_task(
-        redis_consumer.start(rdb),
+        redis_consumer.start(rdb, pub_rdb),
         name="redis-consumer",
     )
     logger.info("ai-coach-service ready ✓")
@@ -76,9 +94,17 @@ async def lifespan(application: FastAPI):
     consumer_task.cancel()
     with suppress(asyncio.CancelledError):
         await consumer_task
-
+    # Jobs still running must stop before the clients they use are closed
+    await redis_consumer.stop()
+    await cv_parser.close()
+
+    cache.init(None)
+    cv_parser.init(None)
+    pdf_pool.shutdown(wait=False, cancel_futures=True)
+    await llm.close_client()
     await database.close_pool()
     await rdb.aclose()
+    await pub_rdb.aclose()
     logger.info("ai-coach-service stopped.")
 
 
@@ -106,4 +132,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=int(AI_COACH_PORT),
         log_level="info",
+        loop="uvloop",
+        http="httptools",
     )
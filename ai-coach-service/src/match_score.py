@@ -10,95 +10,110 @@ Algorithm:
 This is a fast, deterministic baseline. The LLM Pros/Cons adds semantic nuance.
 """
 
-import json
 import re
+from collections import OrderedDict
+from collections.abc import Hashable, Iterator
+from dataclasses import dataclass
 from typing import Any
 
+import orjson
+
+# Profile keyword sets keyed by (user_id, profile updated_at): a user applying
+# to many jobs reuses the set until their profile changes.
+_PROFILE_KW_CACHE_SIZE = 1024
+_profile_kw_cache: OrderedDict[Hashable, frozenset[str]] = OrderedDict()
+
+_TOKEN_RE = re.compile(r"\b[a-zA-ZÀ-ÿ][a-zA-ZÀ-ÿ0-9+#\-.]{1,}\b")
+
 # Common English/French stop words to ignore in keyword extraction
-_STOP_WORDS = {
-    "the",
-    "a",
-    "an",
-    "and",
-    "or",
-    "of",
-    "to",
-    "in",
-    "for",
-    "with",
-    "on",
-    "at",
-    "by",
-    "from",
-    "is",
-    "are",
-    "be",
-    "as",
-    "this",
-    "that",
-    "it",
-    "we",
-    "you",
-    "our",
-    "your",
-    "have",
-    "has",
-    "will",
-    "would",
-    "can",
-    "could",
-    "should",
-    "may",
-    "must",
-    "not",
-    "more",
-    "than",
-    "also",
-    "but",
-    "if",
-    # French
-    "le",
-    "la",
-    "les",
-    "de",
-    "du",
-    "des",
-    "un",
-    "une",
-    "et",
-    "ou",
-    "en",
-    "au",
-    "aux",
-    "par",
-    "sur",
-    "avec",
-    "pour",
-    "dans",
-    "est",
-    "sont",
-    "nous",
-    "vous",
-    "ils",
-    "qui",
-    "que",
-    "mais",
-    "si",
-    "plus",
-    "très",
-    "votre",
-    "notre",
-    "ses",
-    "mon",
-    "ton",
-}
+_STOP_WORDS = frozenset(
+    {
+        "the",
+        "a",
+        "an",
+        "and",
+        "or",
+        "of",
+        "to",
+        "in",
+        "for",
+        "with",
+        "on",
+        "at",
+        "by",
+        "from",
+        "is",
+        "are",
+        "be",
+        "as",
+        "this",
+        "that",
+        "it",
+        "we",
+        "you",
+        "our",
+        "your",
+        "have",
+        "has",
+        "will",
+        "would",
+        "can",
+        "could",
+        "should",
+        "may",
+        "must",
+        "not",
+        "more",
+        "than",
+        "also",
+        "but",
+        "if",
+        # French
+        "le",
+        "la",
+        "les",
+        "de",
+        "du",
+        "des",
+        "un",
+        "une",
+        "et",
+        "ou",
+        "en",
+        "au",
+        "aux",
+        "par",
+        "sur",
+        "avec",
+        "pour",
+        "dans",
+        "est",
+        "sont",
+        "nous",
+        "vous",
+        "ils",
+        "qui",
+        "que",
+        "mais",
+        "si",
+        "plus",
+        "très",
+        "votre",
+        "notre",
+        "ses",
+        "mon",
+        "ton",
+    }
+)
 
 
 def _tokenise(text: str) -> set[str]:
     """Lowercase, remove punctuation, split into tokens, drop stop words."""
-    text = text.lower()
-    tokens = re.findall(r"\b[a-zA-ZÀ-ÿ][a-zA-ZÀ-ÿ0-9+#\-.]{1,}\b", text)
-    return {t for t in tokens if t not in _STOP_WORDS and len(t) > 2}
+    return {
+        t
+        for t in _TOKEN_RE.findall(text.lower())
+        if len(t) > 2 and t not in _STOP_WORDS
+    }
 
 
 def _extract_profile_keywords(
@@ -126,38 +141,87 @@ def _extract_profile_keywords(
     return _tokenise(" ".join(parts))
 
 
+def _profile_keywords(
+    skills: list[Any],
+    experience: list[dict],
+    profile_key: Hashable | None,
+) -> frozenset[str] | set[str]:
+    if profile_key is None:
+        return _extract_profile_keywords(skills, experience)
+
+    keywords = _profile_kw_cache.get(profile_key)
+    if keywords is not None:
+        _profile_kw_cache.move_to_end(profile_key)
+        return keywords
+
+    keywords = frozenset(_extract_profile_keywords(skills, experience))
+    _profile_kw_cache[profile_key] = keywords
+    if len(_profile_kw_cache) > _PROFILE_KW_CACHE_SIZE:
+        _profile_kw_cache.popitem(last=False)
+    return keywords
+
+
+# raw_data fields scanned for job keywords ("contractType" is an Adzuna field)
+_JOB_TEXT_FIELDS = ("title", "description", "company", "contractType")
+
+
+def _iter_texts(value: Any) -> Iterator[str]:
+    """Yield the text pieces of a raw_data value without joining them."""
+    if value is None:
+        return
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        # Common Adzuna shape: {"display_name": "..."}
+        display_name = value.get("display_name")
+        if isinstance(display_name, str):
+            yield display_name
+        else:
+            yield from (v for v in value.values() if isinstance(v, str))
+    elif isinstance(value, list | tuple | set):
+        for v in value:
+            yield from _iter_texts(v)
+    else:
+        yield str(value)
+
+
 def _extract_job_keywords(raw_data: dict) -> set[str]:
     """Extract relevant keywords from a job offer's raw_data JSONB."""
+    keywords: set[str] = set()
+    for field in _JOB_TEXT_FIELDS:
+        for text in _iter_texts(raw_data.get(field)):
+            keywords |= _tokenise(text)
+    return keywords
 
-    def _to_text(value: Any) -> str:
-        if value is None:
-            return ""
-        if isinstance(value, str):
-            return value
-        if isinstance(value, dict):
-            # Common Adzuna shape: {"display_name": "..."}
-            display_name = value.get("display_name")
-            if isinstance(display_name, str):
-                return display_name
-            return " ".join(str(v) for v in value.values() if isinstance(v, str))
-        if isinstance(value, list | tuple | set):
-            return " ".join(_to_text(v) for v in value)
-        return str(value)
-
-    parts = [
-        _to_text(raw_data.get("title", "")),
-        _to_text(raw_data.get("description", "")),
-        _to_text(raw_data.get("company", "")),
-    ]
-    # Some Adzuna fields
-    parts.append(_to_text(raw_data.get("contractType", "")))
-    return _tokenise(" ".join(p for p in parts if p))
+
+@dataclass(frozen=True, slots=True)
+class JobContext:
+    """Job-side inputs derived once per analysis and shared by its consumers."""
+
+    raw_data: dict
+    description: str
+    keywords: frozenset[str]
+
+    @classmethod
+    def from_raw(cls, raw_data: dict | str) -> "JobContext":
+        if isinstance(raw_data, str):
+            try:
+                raw_data = orjson.loads(raw_data)
+            except orjson.JSONDecodeError:
+                raw_data = {}
+        description = raw_data.get("description", "")
+        return cls(
+            raw_data=raw_data,
+            description=description if isinstance(description, str) else "",
+            keywords=frozenset(_extract_job_keywords(raw_data)),
+        )
 
 
 def compute(
     skills: list[Any],
     experience: list[dict],
-    raw_data: dict | str,
+    raw_data: dict | str | JobContext,
+    profile_key: Hashable | None = None,
 ) -> int:
     """
     Compute a MatchScore (0–100) between the profile and the job offer.
@@ -165,27 +229,30 @@ def compute(
     Args:
         skills:     profile.skills_json (list of str or {"name":..., "level":...})
         experience: profile.experience_json
-        raw_data:   job_feed.raw_data (dict or JSON string)
+        raw_data:   job_feed.raw_data (dict or JSON string), or a JobContext
+                    already built for this job (skips re-tokenising it)
+        profile_key: identifies this version of the profile, e.g.
+                    (user_id, profiles.updated_at); when given, the profile
+                    keywords are cached under it across calls
 
     Returns:
         Integer score from 0 to 100.
     """
-    if isinstance(raw_data, str):
-        try:
-            raw_data = json.loads(raw_data)
-        except json.JSONDecodeError:
-            raw_data = {}
-
-    profile_kw = _extract_profile_keywords(skills, experience)
-    job_kw = _extract_job_keywords(raw_data)
+    job = (
+        raw_data if isinstance(raw_data, JobContext) else JobContext.from_raw(raw_data)
+    )
 
+    job_kw = job.keywords
     if not job_kw:
         return 50  # No data to compare — neutral score
 
-    overlap = profile_kw & job_kw
-    raw_score = len(overlap) / len(job_kw) * 100
+    profile_kw = _profile_keywords(skills, experience, profile_key)
+    if not profile_kw:
+        return 0
+
+    overlap = len(profile_kw & job_kw)
 
     # Scale: a 30%+ keyword overlap is considered excellent (→ 100).
     # Anything below 5% is considered poor (→ remain low).
-    scaled = min(100, int(raw_score * (100 / 30)))
-    return max(0, scaled)
+    # Integer form of int(overlap / len(job_kw) * 100 * (100 / 30)).
+    return min(100, overlap * 100 * 100 // (len(job_kw) * 30))
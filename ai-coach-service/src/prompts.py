@@ -1,41 +1,63 @@
 """
 Prompt templates for all AI Coach generation tasks.
 Each function returns (system_prompt, user_prompt) ready to pass to llm.chat_*
+
+Profile-derived blocks (comma-joined skills, formatted experience) are built
+once by the caller and shared across all three prompts. System prompts are
+module constants; user prompts are f-strings (compiled once with the module)
+written without surrounding blank lines so no post-render strip() is needed.
 """
 
+from functools import lru_cache
+
+_PROS_CONS_SYSTEM = (
+    "You are an expert career coach. Analyse the fit between a candidate profile "
+    "and a job offer. You MUST respond with valid JSON only — no markdown, no explanation. "
+    "The JSON MUST follow this exact schema:\n"
+    '{"pros": ["string", ...], "cons": ["string", ...]}\n'
+    "Each pro/con should be a concrete, actionable sentence (max 20 words)."
+)
+
+_COVER_LETTER_SYSTEM = (
+    "You are a professional cover letter writer. Write a concise, compelling cover letter "
+    "tailored to the job and the candidate's background. "
+    "The letter should be in the same language as the job description. "
+    "Keep it under 300 words. Use a professional but human tone."
+)
+
+_CV_SUGGESTIONS_SYSTEM = (
+    "You are an ATS (Applicant Tracking System) expert. Analyse the job description and "
+    "suggest concrete improvements to make the candidate's CV rank higher. "
+    "You MUST respond with valid JSON only.\n"
+    'Schema: {"suggestions": ["string", ...]}\n'
+    "Give 3-5 actionable bullet points. Focus on keywords to add, skills to highlight, "
+    "and formatting best practices."
+)
+
 
 def pros_cons_prompt(
     job_title: str,
     job_description: str,
     company: str,
-    profile_skills: list[str],
-    profile_experience: list[dict],
+    skills_csv: str,
+    experience_block: str,
     match_score: int,
 ) -> tuple[str, str]:
-    system = (
-        "You are an expert career coach. Analyse the fit between a candidate profile "
-        "and a job offer. You MUST respond with valid JSON only — no markdown, no explanation. "
-        "The JSON MUST follow this exact schema:\n"
-        '{"pros": ["string", ...], "cons": ["string", ...]}\n'
-        "Each pro/con should be a concrete, actionable sentence (max 20 words)."
-    )
-    user = f"""
-Job title: {job_title}
+    user = f"""Job title: {job_title}
 Company: {company}
 Match score: {match_score}/100
 
 Job description (truncated to 1500 chars):
 {job_description[:1500]}
 
-Candidate skills: {', '.join(profile_skills) or 'Not specified'}
+Candidate skills: {skills_csv or 'Not specified'}
 
 Recent experience:
-{_format_experience(profile_experience[:3])}
+{experience_block}
 
 Give 3-5 pros and 2-4 cons. Be specific and honest.
-Respond with JSON only.
-""".strip()
-    return system, user
+Respond with JSON only."""
+    return _PROS_CONS_SYSTEM, user
 
 
 def cover_letter_prompt(
@@ -43,8 +65,8 @@ def cover_letter_prompt(
     company: str,
     job_description: str,
     full_name: str,
-    profile_skills: list[str],
-    profile_experience: list[dict],
+    skills_csv: str,
+    experience_block: str,
     template: str = "",
 ) -> tuple[str, str]:
     template_section = (
@@ -52,64 +74,58 @@ def cover_letter_prompt(
         if template
         else ""
     )
-    system = (
-        "You are a professional cover letter writer. Write a concise, compelling cover letter "
-        "tailored to the job and the candidate's background. "
-        "The letter should be in the same language as the job description. "
-        "Keep it under 300 words. Use a professional but human tone."
-    )
-    user = f"""
-Write a cover letter for:
+    user = f"""Write a cover letter for:
 
 Position: {job_title} at {company}
 Candidate name: {full_name or 'the candidate'}
-Skills: {', '.join(profile_skills) or 'Not specified'}
+Skills: {skills_csv or 'Not specified'}
 {template_section}
 Experience:
-{_format_experience(profile_experience[:3])}
+{experience_block}
 
 Job description (truncated):
 {job_description[:1200]}
 
-Output ONLY the cover letter text (no subject line, no JSON wrapper).
-""".strip()
-    return system, user
+Output ONLY the cover letter text (no subject line, no JSON wrapper)."""
+    return _COVER_LETTER_SYSTEM, user
 
 
 def cv_suggestions_prompt(
     job_title: str,
     job_description: str,
-    profile_skills: list[str],
+    skills_csv: str,
 ) -> tuple[str, str]:
-    system = (
-        "You are an ATS (Applicant Tracking System) expert. Analyse the job description and "
-        "suggest concrete improvements to make the candidate's CV rank higher. "
-        "You MUST respond with valid JSON only.\n"
-        'Schema: {"suggestions": ["string", ...]}\n'
-        "Give 3-5 actionable bullet points. Focus on keywords to add, skills to highlight, "
-        "and formatting best practices."
-    )
-    user = f"""
-Target role: {job_title}
-Current skills listed: {', '.join(profile_skills) or 'None'}
+    user = f"""Target role: {job_title}
+Current skills listed: {skills_csv or 'None'}
 Job description keywords (first 1000 chars): {job_description[:1000]}
 
 What specific changes should the candidate make to their CV?
-Respond with JSON only.
-""".strip()
-    return system, user
+Respond with JSON only."""
+    return _CV_SUGGESTIONS_SYSTEM, user
 
 
 # ── Helpers ────────────────────────────────────────────────────
 
 
-def _format_experience(experience: list[dict]) -> str:
-    if not experience:
+def format_experience(experience: list[dict], limit: int = 3) -> str:
+    """Render the most recent `limit` experience entries as a bullet block."""
+    entries = tuple(
+        (
+            str(item.get("role") or item.get("title") or "Unknown role"),
+            str(item.get("company", "")),
+            str(item.get("description", "")[:150]),
+        )
+        for item in experience[:limit]
+    )
+    return _render_experience(entries)
+
+
+@lru_cache(maxsize=1024)
+def _render_experience(entries: tuple[tuple[str, str, str], ...]) -> str:
+    # Keyed on the normalised entries: a profile analysed against many jobs
+    # renders its experience block once.
+    if not entries:
         return "No experience provided."
-    lines = []
-    for item in experience:
-        role = item.get("role") or item.get("title") or "Unknown role"
-        company = item.get("company", "")
-        desc = item.get("description", "")
-        lines.append(f"- {role} at {company}: {desc[:150]}")
-    return "\n".join(lines)
+    return "\n".join(
+        f"- {role} at {company}: {desc}" for role, company, desc in entries
+    )
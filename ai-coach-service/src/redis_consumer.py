@@ -1,10 +1,18 @@
 """
-Redis Pub/Sub consumer.
+Redis command consumer.
 
-Subscribes to:
+Consumes (Redis Streams, consumer group "ai-coach"):
   - CMD_ANALYZE_JOB  → analyzer.analyze(applicationId, userId)
   - CMD_PARSE_CV     → cv_parser.parse(userId, cvUrl)
 
+Commands are streams so none is lost while the service is restarting or
+busy: each entry is XACKed once its job has finished (success or reported
+failure), entries left pending by a crash are replayed on startup, entries
+left pending by a consumer that is gone (e.g. a redeployed container under a
+new hostname) are XAUTOCLAIMed once idle past STREAM_CLAIM_IDLE_SECONDS, and
+several replicas can share the group. Producers XADD the JSON payload under
+the "payload" field.
+
 Message payloads (JSON):
 
   CMD_ANALYZE_JOB:
@@ -15,90 +23,326 @@ Message payloads (JSON):
 """
 
 import asyncio
-import json
 import logging
+import socket
+import uuid
+from collections.abc import Awaitable, Callable, Coroutine
+from typing import Annotated
 
+import msgspec
+import orjson
 import redis.asyncio as aioredis
 
 import analyzer
 import cv_parser
-from config import ANALYSIS_TIMEOUT_SECONDS, REDIS_URL
+from config import (
+    ANALYSIS_TIMEOUT_SECONDS,
+    MAX_CONCURRENT_JOBS,
+    REDIS_POOL_SIZE,
+    REDIS_URL,
+    STREAM_CLAIM_IDLE_SECONDS,
+)
 
 logger = logging.getLogger(__name__)
 
-CHANNELS = ["CMD_ANALYZE_JOB", "CMD_PARSE_CV"]
+ANALYZE_STREAM = "CMD_ANALYZE_JOB"
+PARSE_CV_STREAM = "CMD_PARSE_CV"
+CONSUMER_GROUP = "ai-coach"
+# Stable per container so its own pending entries are replayed on restart;
+# entries of consumers that never come back are taken over by _claim_stale
+CONSUMER_NAME = f"worker-{socket.gethostname()}"
+STREAM_BATCH_SIZE = 16
+STREAM_BLOCK_MS = 5000
+# How often each stream is scanned for stale pending entries of other consumers
+STREAM_CLAIM_INTERVAL_SECONDS = 60
+
+# Bounds how many jobs run at once; extra jobs wait for a free slot.
+_job_slots = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+# Strong references to in-flight tasks (asyncio only keeps weak ones).
+_tasks: set[asyncio.Task] = set()
+
+# ─── Command payloads ─────────────────────────────────────────────────────────
+
+NonEmptyStr = Annotated[str, msgspec.Meta(min_length=1)]
+
+
+# Ids are decoded as UUIDs so a malformed id is rejected here, before it
+# costs a DB round-trip or an LLM call.
+class AnalyzeJobCmd(msgspec.Struct, frozen=True):
+    applicationId: uuid.UUID
+    userId: uuid.UUID
+    jobFeedId: str | None = None  # informational only, not validated
+
+
+class ParseCvCmd(msgspec.Struct, frozen=True):
+    userId: uuid.UUID
+    cvUrl: NonEmptyStr
+
+
+# Decoders are built once; decoding validates required fields in the same pass.
+_DECODERS: dict[str, msgspec.json.Decoder] = {
+    ANALYZE_STREAM: msgspec.json.Decoder(AnalyzeJobCmd),
+    PARSE_CV_STREAM: msgspec.json.Decoder(ParseCvCmd),
+}
+
+# A dispatcher schedules the job for a decoded command, waiting for a free
+# slot first; `on_done` is awaited once the job has finished.
+Dispatcher = Callable[
+    [msgspec.Struct, aioredis.Redis, Callable[[], Awaitable]], Awaitable[None]
+]
 
 
-async def start(rdb: aioredis.Redis) -> None:
+async def start(rdb: aioredis.Redis, publisher: aioredis.Redis | None = None) -> None:
     """
-    Long-running coroutine that listens on all command channels forever.
+    Long-running coroutine that consumes all command streams forever.
     Should be run as an asyncio task.
+
+    Jobs publish their EVENT_* results through `publisher` (a client
+    dedicated to publishing) so they never contend with the stream reads;
+    it defaults to `rdb` when not given.
     """
-    pubsub = rdb.pubsub()
-    await pubsub.subscribe(*CHANNELS)
-    logger.info("Subscribed to Redis channels: %s", CHANNELS)
+    if publisher is None:
+        publisher = rdb
+    await asyncio.gather(
+        _consume_stream(rdb, publisher, ANALYZE_STREAM, _dispatch_analyze),
+        _consume_stream(rdb, publisher, PARSE_CV_STREAM, _dispatch_parse_cv),
+    )
 
-    async for message in pubsub.listen():
-        if message["type"] != "message":
-            continue
 
-        channel = message.get("channel", b"")
-        if isinstance(channel, bytes):
-            channel = channel.decode("utf-8")
+async def stop() -> None:
+    """
+    Cancel every in-flight job and wait for them to unwind. Call after the
+    consumer task is cancelled and before closing the clients jobs use: a
+    cancelled job skips its XACK, so its entry stays pending and is replayed
+    (or claimed by another replica) instead of being saved half-done.
+    """
+    tasks = list(_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if tasks:
+        logger.info(
+            "Cancelled %d in-flight jobs; their entries stay pending", len(tasks)
+        )
 
-        raw = message.get("data", b"")
-        if isinstance(raw, bytes):
-            raw = raw.decode("utf-8")
 
-        logger.info("Received [%s]: %s", channel, raw[:200])
+async def _consume_stream(
+    rdb: aioredis.Redis,
+    publisher: aioredis.Redis,
+    stream: str,
+    dispatch: Dispatcher,
+) -> None:
+    try:
+        await rdb.xgroup_create(stream, CONSUMER_GROUP, id="0", mkstream=True)
+    except aioredis.ResponseError as exc:
+        if "BUSYGROUP" not in str(exc):
+            raise
+    logger.info("Consuming stream %s as %s/%s", stream, CONSUMER_GROUP, CONSUMER_NAME)
+
+    # 1. Replay entries delivered to this consumer but never acknowledged
+    last_id = "0"
+    while True:
+        entries = await _read_stream(rdb, stream, last_id)
+        if not entries:
+            break
+        logger.info("Replaying %d pending %s entries", len(entries), stream)
+        for msg_id, fields in entries:
+            await _handle_stream_entry(stream, msg_id, fields, rdb, publisher, dispatch)
+        last_id = entries[-1][0]
+
+    # 2. New entries, while periodically taking over other consumers' stale ones
+    await asyncio.gather(
+        _read_new(rdb, publisher, stream, dispatch),
+        _claim_stale(rdb, publisher, stream, dispatch),
+    )
+
 
+async def _read_new(
+    rdb: aioredis.Redis,
+    publisher: aioredis.Redis,
+    stream: str,
+    dispatch: Dispatcher,
+) -> None:
+    while True:
+        for msg_id, fields in await _read_stream(
+            rdb, stream, ">", block=STREAM_BLOCK_MS
+        ):
+            await _handle_stream_entry(stream, msg_id, fields, rdb, publisher, dispatch)
+
+
+async def _claim_stale(
+    rdb: aioredis.Redis,
+    publisher: aioredis.Redis,
+    stream: str,
+    dispatch: Dispatcher,
+) -> None:
+    """
+    At startup and then every STREAM_CLAIM_INTERVAL_SECONDS, XAUTOCLAIM
+    entries pending for longer than STREAM_CLAIM_IDLE_SECONDS on any consumer
+    of the group and handle them here.
+    """
+    while True:
         try:
-            payload = json.loads(raw)
-        except json.JSONDecodeError:
-            logger.error("Invalid JSON on channel %s: %s", channel, raw)
-            continue
+            await _claim_stale_once(rdb, publisher, stream, dispatch)
+        except aioredis.RedisError as exc:
+            logger.warning("Claiming stale %s entries failed: %s", stream, exc)
+        await asyncio.sleep(STREAM_CLAIM_INTERVAL_SECONDS)
+
+
+async def _claim_stale_once(
+    rdb: aioredis.Redis,
+    publisher: aioredis.Redis,
+    stream: str,
+    dispatch: Dispatcher,
+) -> None:
+    cursor: str | bytes = "0-0"
+    while True:
+        resp = await rdb.xautoclaim(
+            stream,
+            CONSUMER_GROUP,
+            CONSUMER_NAME,
+            min_idle_time=STREAM_CLAIM_IDLE_SECONDS * 1000,
+            start_id=cursor,
+            count=STREAM_BATCH_SIZE,
+        )
+        cursor, entries = resp[0], resp[1]
+        if entries:
+            logger.info("Claimed %d stale pending %s entries", len(entries), stream)
+        for msg_id, fields in entries:
+            await _handle_stream_entry(stream, msg_id, fields, rdb, publisher, dispatch)
+        # A cursor of 0-0 means the whole pending list has been scanned
+        if cursor in (b"0-0", "0-0"):
+            return
+
+
+async def _read_stream(
+    rdb: aioredis.Redis, stream: str, last_id: str | bytes, block: int | None = None
+) -> list:
+    resp = await rdb.xreadgroup(
+        CONSUMER_GROUP,
+        CONSUMER_NAME,
+        {stream: last_id},
+        count=STREAM_BATCH_SIZE,
+        block=block,
+    )
+    return resp[0][1] if resp else []
+
+
+async def _handle_stream_entry(
+    stream: str,
+    msg_id: bytes,
+    fields: dict | None,
+    rdb: aioredis.Redis,
+    publisher: aioredis.Redis,
+    dispatch: Dispatcher,
+) -> None:
+    def ack() -> Awaitable:
+        return rdb.xack(stream, CONSUMER_GROUP, msg_id)
+
+    if not fields:
+        # A pending entry already trimmed from the stream (MAXLEN ~) is
+        # replayed without fields (None, or {} depending on the redis-py
+        # parser): its payload is gone, so just drop it.
+        logger.warning("Pending %s entry %s was trimmed; acknowledging", stream, msg_id)
+        _track(ack(), name=f"ack-{msg_id}")
+        return
+
+    raw = fields.get(b"payload", b"")
+    logger.info("Received [%s %s]: %s", stream, msg_id, raw[:200])
+
+    try:
+        cmd = _DECODERS[stream].decode(raw)
+    except msgspec.DecodeError as exc:
+        # Rejected payloads are acknowledged straight away — retrying cannot fix them
+        logger.error("Invalid %s payload (%s): %s", stream, exc, raw)
+        _track(ack(), name=f"ack-{msg_id}")
+        return
 
-        if channel == "CMD_ANALYZE_JOB":
-            _dispatch_analyze(payload, rdb)
-        elif channel == "CMD_PARSE_CV":
-            _dispatch_parse_cv(payload, rdb)
-        else:
-            logger.warning("Unhandled channel: %s", channel)
+    await dispatch(cmd, publisher, ack)
 
 
 # ─── Dispatchers ─────────────────────────────────────────────────────────────
 
 
-def _dispatch_analyze(payload: dict, rdb: aioredis.Redis) -> None:
-    application_id = payload.get("applicationId")
-    user_id = payload.get("userId")
+async def _dispatch_analyze(
+    cmd: AnalyzeJobCmd,
+    rdb: aioredis.Redis,
+    on_done: Callable[[], Awaitable] | None = None,
+) -> None:
+    await _spawn(
+        _safe_analyze(str(cmd.applicationId), str(cmd.userId), rdb),
+        name=f"analyze-{cmd.applicationId}",
+        on_done=on_done,
+    )
 
-    if not application_id or not user_id:
-        logger.error("CMD_ANALYZE_JOB missing required fields: %s", payload)
-        return
 
-    asyncio.create_task(
-        _safe_analyze(application_id, user_id, rdb),
-        name=f"analyze-{application_id}",
+async def _dispatch_parse_cv(
+    cmd: ParseCvCmd,
+    rdb: aioredis.Redis,
+    on_done: Callable[[], Awaitable] | None = None,
+) -> None:
+    await _spawn(
+        _safe_parse_cv(str(cmd.userId), cmd.cvUrl, rdb),
+        name=f"parse-cv-{cmd.userId}",
+        on_done=on_done,
     )
 
 
-def _dispatch_parse_cv(payload: dict, rdb: aioredis.Redis) -> None:
-    user_id = payload.get("userId")
-    cv_url = payload.get("cvUrl")
+async def _spawn(
+    coro: Coroutine, name: str, on_done: Callable[[], Awaitable] | None = None
+) -> None:
+    """
+    Wait for a free concurrency slot, then run the job in the background.
+    `on_done` (e.g. a stream XACK) is awaited once the job has finished.
 
-    if not user_id or not cv_url:
-        logger.error("CMD_PARSE_CV missing required fields: %s", payload)
-        return
+    Waiting here (rather than inside the task) stops the stream readers while
+    every slot is busy, so unread entries stay in the stream for other
+    replicas instead of piling up as waiting tasks in this one.
+    """
+    try:
+        await _job_slots.acquire()
+    except asyncio.CancelledError:
+        coro.close()
+        raise
+
+    async def _run():
+        try:
+            await coro
+        finally:
+            _job_slots.release()
+        if on_done is not None:
+            try:
+                await on_done()
+            except Exception as exc:
+                logger.warning("Post-job callback for %s failed: %s", name, exc)
+
+    _track(_run(), name=name)
 
-    asyncio.create_task(
-        _safe_parse_cv(user_id, cv_url, rdb),
-        name=f"parse-cv-{user_id}",
-    )
+
+def _track(coro: Awaitable, name: str) -> None:
+    task = asyncio.create_task(coro, name=name)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
 
 
 # ─── Safe wrappers ────────────────────────────────────────────────────────────
 
+# Static part of the EVENT_ANALYSIS_DONE payloads published on failure
+_TIMEOUT_EVENT = {
+    "type": "EVENT_ANALYSIS_DONE",
+    "matchScore": None,
+    "hasCoverLetter": False,
+    "status": "timeout",
+    "error": "Analysis exceeded max duration",
+}
+_ERROR_EVENT = {
+    "type": "EVENT_ANALYSIS_DONE",
+    "matchScore": None,
+    "hasCoverLetter": False,
+    "status": "error",
+    "error": "Analysis failed",
+}
+
 
 async def _safe_analyze(application_id: str, user_id: str, rdb: aioredis.Redis) -> None:
     """Wrapper that catches and logs any exception from the analyzer."""
@@ -115,16 +359,8 @@ async def _safe_analyze(application_id: str, user_id: str, rdb: aioredis.Redis)
         )
         await rdb.publish(
             "EVENT_ANALYSIS_DONE",
-            json.dumps(
-                {
-                    "type": "EVENT_ANALYSIS_DONE",
-                    "applicationId": application_id,
-                    "userId": user_id,
-                    "matchScore": None,
-                    "hasCoverLetter": False,
-                    "status": "timeout",
-                    "error": "Analysis exceeded max duration",
-                }
+            orjson.dumps(
+                _TIMEOUT_EVENT | {"applicationId": application_id, "userId": user_id}
             ),
         )
     except Exception as exc:
@@ -133,16 +369,8 @@ async def _safe_analyze(application_id: str, user_id: str, rdb: aioredis.Redis)
         )
         await rdb.publish(
             "EVENT_ANALYSIS_DONE",
-            json.dumps(
-                {
-                    "type": "EVENT_ANALYSIS_DONE",
-                    "applicationId": application_id,
-                    "userId": user_id,
-                    "matchScore": None,
-                    "hasCoverLetter": False,
-                    "status": "error",
-                    "error": "Analysis failed",
-                }
+            orjson.dumps(
+                _ERROR_EVENT | {"applicationId": application_id, "userId": user_id}
             ),
         )
 
@@ -155,10 +383,17 @@ async def _safe_parse_cv(user_id: str, cv_url: str, rdb: aioredis.Redis) -> None
         logger.exception("Unhandled error parsing CV for user %s: %s", user_id, exc)
 
 
-async def create_redis_client() -> aioredis.Redis:
-    """Create and verify an async Redis connection."""
-    logger.info("Connecting Redis consumer to %s…", REDIS_URL)
-    rdb = await aioredis.from_url(REDIS_URL, decode_responses=False)
+async def create_redis_client(role: str = "consumer") -> aioredis.Redis:
+    """
+    Create and verify an async Redis client backed by its own pool of
+    REDIS_POOL_SIZE connections, so concurrent jobs publish on separate
+    sockets instead of queueing behind one another.
+    """
+    logger.info("Connecting Redis %s to %s…", role, REDIS_URL)
+    pool = aioredis.BlockingConnectionPool.from_url(
+        REDIS_URL, max_connections=REDIS_POOL_SIZE, decode_responses=False
+    )
+    rdb = aioredis.Redis(connection_pool=pool)
     await rdb.ping()
-    logger.info("Redis consumer connected ✓")
+    logger.info("Redis %s connected ✓", role)
     return rdb
@@ -4,12 +4,13 @@ Unit tests for cv_parser.parse().
 Run with:  pytest tests/test_cv_parser.py -v
 
 All external I/O is mocked:
-  - pdfminer.high_level.extract_text   → returns a fake CV text
+  - cv_parser.extract_text             → returns a fake CV text
   - llm.chat_json                      → returns a structured dict
   - database.get_pool                  → returns an async mock
   - rdb.publish                        → async mock
 """
 
+import asyncio
 import json
 import os
 import sys
@@ -99,6 +100,20 @@ class _AsyncCtxMgr:
         pass
 
 
+@pytest.fixture(autouse=True)
+def _unbatched(monkeypatch):
+    """Parse one CV per LLM call; CvBatcher is exercised directly below.
+
+    The module-level batcher is built at import with whatever window config.py
+    read first, so it is swapped here rather than set through the environment.
+    """
+    monkeypatch.setattr(
+        cv_parser,
+        "_batcher",
+        cv_parser.CvBatcher(window=0, max_size=1, max_chars=cv_parser.MAX_BATCH_CHARS),
+    )
+
+
 # ── Tests ─────────────────────────────────────────────────────────────────────
 
 
@@ -159,7 +174,7 @@ class TestParse:
 
     @pytest.mark.asyncio
     async def test_empty_pdf_text_publishes_error_event(self, tmp_path):
-        """If pdfminer returns empty text, publish an error event and abort."""
+        """If PDF extraction returns empty text, publish an error event and abort."""
         pdf_file = tmp_path / "empty.pdf"
         pdf_file.write_bytes(b"%PDF-1.4")
 
@@ -224,6 +239,43 @@ class TestParse:
         # fieldsUpdated.experience should be 0 (empty list from LLM)
         assert event["fieldsUpdated"]["experience"] == 0
 
+    @pytest.mark.asyncio
+    async def test_update_only_sets_non_empty_columns(self, tmp_path):
+        """Empty sections are left out of the UPDATE so existing data is kept."""
+        pdf_file = tmp_path / "partial2.pdf"
+        pdf_file.write_bytes(b"%PDF-1.4")
+
+        partial_response = {
+            "skills": [{"name": "Python", "level": "expert"}],
+            "projects": [{"name": "JobMate"}],
+        }
+
+        pool_mock, conn_mock = _make_pool_mock()
+        rdb_mock = AsyncMock()
+
+        with (
+            patch("cv_parser.UPLOAD_BASE", str(tmp_path)),
+            patch("cv_parser.extract_text", return_value=FAKE_CV_TEXT),
+            patch(
+                "cv_parser.llm.chat_json",
+                new_callable=AsyncMock,
+                return_value=partial_response,
+            ),
+            patch("cv_parser.get_pool", return_value=pool_mock),
+        ):
+            await cv_parser.parse("user-uuid-6", "/uploads/partial2.pdf", rdb_mock)
+
+        sql, *args = conn_mock.execute.call_args[0]
+        assert "skills_json = $1::jsonb" in sql
+        assert "projects_json = $2::jsonb" in sql
+        assert "experience_json" not in sql
+        assert "WHERE user_id = $3" in sql
+        assert args == [
+            partial_response["skills"],
+            partial_response["projects"],
+            "user-uuid-6",
+        ]
+
 
 class TestCvExtractPrompt:
     """Sanity checks on the private prompt builder."""
@@ -237,3 +289,51 @@ class TestCvExtractPrompt:
         system, _ = cv_parser._cv_extract_prompt("text")
         for key in ("skills", "experience", "education", "certifications", "projects"):
             assert key in system, f"Key '{key}' missing from system prompt"
+
+
+class TestCvBatcher:
+    """Coalescing of concurrent CV extractions into one LLM prompt."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cvs_share_one_llm_call(self):
+        batcher = cv_parser.CvBatcher(window=0.05, max_size=4, max_chars=24000)
+        second = {**FAKE_LLM_RESPONSE, "skills": [{"name": "Go", "level": "expert"}]}
+        chat_mock = AsyncMock(return_value={"cvs": [FAKE_LLM_RESPONSE, second]})
+
+        with patch("cv_parser.llm.chat_json", chat_mock):
+            first_result, second_result = await asyncio.gather(
+                batcher.extract("CV one"), batcher.extract("CV two")
+            )
+
+        chat_mock.assert_awaited_once()
+        _, user = chat_mock.call_args[0]
+        assert "=== CV 1 ===\nCV one" in user
+        assert "=== CV 2 ===\nCV two" in user
+        assert first_result == FAKE_LLM_RESPONSE
+        assert second_result == second
+
+    @pytest.mark.asyncio
+    async def test_single_cv_uses_single_prompt(self):
+        batcher = cv_parser.CvBatcher(window=0.01, max_size=4, max_chars=24000)
+        chat_mock = AsyncMock(return_value=FAKE_LLM_RESPONSE)
+
+        with patch("cv_parser.llm.chat_json", chat_mock):
+            result = await batcher.extract("lonely CV")
+
+        assert result == FAKE_LLM_RESPONSE
+        assert chat_mock.call_args[0] == cv_parser._cv_extract_prompt("lonely CV")
+
+    @pytest.mark.asyncio
+    async def test_malformed_batch_falls_back_to_individual_calls(self):
+        batcher = cv_parser.CvBatcher(window=0.05, max_size=2, max_chars=24000)
+        chat_mock = AsyncMock(
+            side_effect=[{"cvs": [FAKE_LLM_RESPONSE]}, {"skills": []}, None]
+        )
+
+        with patch("cv_parser.llm.chat_json", chat_mock):
+            results = await asyncio.gather(
+                batcher.extract("CV one"), batcher.extract("CV two")
+            )
+
+        assert chat_mock.await_count == 3
+        assert results == [{"skills": []}, None]
@@ -105,6 +105,24 @@ class TestComputeEdge:
         score = ms.compute(PYTHON_SKILLS, [], {})
         assert score == 50
 
+    def test_job_context_matches_raw_data(self):
+        job = ms.JobContext.from_raw(PYTHON_JOB)
+        assert job.description == PYTHON_JOB["description"]
+        assert ms.compute(PYTHON_SKILLS, [], job) == ms.compute(
+            PYTHON_SKILLS, [], PYTHON_JOB
+        )
+
+    def test_profile_key_caches_keywords_until_profile_changes(self):
+        key = ("user-1", "2024-01-01T00:00:00")
+        first = ms.compute(PYTHON_SKILLS, [], PYTHON_JOB, profile_key=key)
+        # Same profile version: cached keywords are reused even if the lists differ
+        assert ms.compute(JAVA_SKILLS, [], PYTHON_JOB, profile_key=key) == first
+        # New profile version: keywords are recomputed
+        new_key = ("user-1", "2024-02-01T00:00:00")
+        assert ms.compute(
+            JAVA_SKILLS, [], PYTHON_JOB, profile_key=new_key
+        ) == ms.compute(JAVA_SKILLS, [], PYTHON_JOB)
+
     def test_company_as_object_does_not_crash(self):
         adzuna_job = {
             "title": "Développeur Python",
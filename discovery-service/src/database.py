@@ -4,8 +4,10 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import random
 
 import asyncpg
+import orjson
 
 import config
 
@@ -13,6 +15,26 @@ logger = logging.getLogger(__name__)
 _pool: asyncpg.Pool | None = None
 
 
+def _encode_jsonb(value) -> bytes:
+    # Binary JSONB wire format: 1-byte version header followed by JSON text
+    return b"\x01" + orjson.dumps(value)
+
+
+def _decode_jsonb(data: bytes):
+    return orjson.loads(data[1:])
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """Encode dict/list JSONB params with orjson instead of json.dumps per call."""
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=_encode_jsonb,
+        decoder=_decode_jsonb,
+        schema="pg_catalog",
+        format="binary",
+    )
+
+
 async def get_pool() -> asyncpg.Pool:
     global _pool
     if _pool is None:
@@ -20,11 +42,24 @@ async def get_pool() -> asyncpg.Pool:
     return _pool
 
 
-async def _create_pool(retries: int = 10, delay: float = 2.0) -> asyncpg.Pool:
+async def _create_pool(
+    retries: int = 10, delay: float = 0.5, max_delay: float = 30.0
+) -> asyncpg.Pool:
     for attempt in range(1, retries + 1):
         try:
             pool = await asyncpg.create_pool(
-                config.DATABASE_URL, min_size=2, max_size=10
+                config.DATABASE_URL,
+                min_size=2,
+                max_size=10,
+                init=_init_connection,
+                # Fail an attempt quickly while the DB is still starting up
+                timeout=5,
+                # All queries are constant SQL text, so asyncpg's per-connection
+                # prepared-statement cache keeps every one of them parsed and
+                # planned. Disable the default 300 s expiry so statements on a
+                # connection idle between scrapes are not re-prepared.
+                statement_cache_size=100,
+                max_cached_statement_lifetime=0,
             )
             logger.info("Database pool created")
             return pool
@@ -34,7 +69,10 @@ async def _create_pool(retries: int = 10, delay: float = 2.0) -> asyncpg.Pool:
             )
             if attempt == retries:
                 raise
-            await asyncio.sleep(delay)
+            # Exponential backoff with jitter: quick retries while the DB is
+            # coming up, and services restarting together do not retry in step.
+            backoff = min(max_delay, delay * 2 ** (attempt - 1))
+            await asyncio.sleep(backoff * random.uniform(0.5, 1.5))
     raise RuntimeError("unreachable")
 
 
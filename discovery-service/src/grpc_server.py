@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import os
 
+import asyncpg
 import grpc
+from cachetools import TTLCache
 from grpc import aio
 from grpc_reflection.v1alpha import reflection
 
@@ -21,6 +22,24 @@ logger = logging.getLogger(__name__)
 _pb2 = None
 _pb2_grpc = None
 
+# (search_config_id, user_id) pairs already confirmed as owned. Only positive
+# answers are cached, so a config created a moment ago is never wrongly
+# rejected. A deleted config is caught by _insert_job_feed (foreign-key
+# violation → evict + NOT_FOUND); any other change of ownership can go
+# unnoticed for at most the TTL.
+_owned_configs: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+PROTO_OUT_DIR = "/tmp/discovery_service_proto"
+
+
+def _stubs_up_to_date(out_dir: str) -> bool:
+    proto_mtime = os.path.getmtime(config.PROTO_FILE)
+    for name in ("discovery_pb2.py", "discovery_pb2_grpc.py"):
+        path = os.path.join(out_dir, name)
+        if not os.path.exists(path) or os.path.getmtime(path) < proto_mtime:
+            return False
+    return True
+
 
 def _load_proto():
     global _pb2, _pb2_grpc
@@ -32,21 +51,24 @@ def _load_proto():
     from grpc_tools import protoc
 
     proto_include = os.path.join(os.path.dirname(grpc_tools.__file__), "_proto")
-    out_dir = "/tmp/discovery_service_proto"
+    out_dir = PROTO_OUT_DIR
     os.makedirs(out_dir, exist_ok=True)
 
-    code = protoc.main(
-        [
-            "grpc_tools.protoc",
-            f"--proto_path={config.PROTO_DIR}",
-            f"--proto_path={proto_include}",
-            f"--python_out={out_dir}",
-            f"--grpc_python_out={out_dir}",
-            config.PROTO_FILE,
-        ]
-    )
-    if code != 0:
-        raise RuntimeError(f"protoc compilation failed (code={code})")
+    # The image pre-generates the stubs at build time; only run protoc when
+    # they are missing or older than the proto (e.g. a dev-mounted PROTO_DIR).
+    if not _stubs_up_to_date(out_dir):
+        code = protoc.main(
+            [
+                "grpc_tools.protoc",
+                f"--proto_path={config.PROTO_DIR}",
+                f"--proto_path={proto_include}",
+                f"--python_out={out_dir}",
+                f"--grpc_python_out={out_dir}",
+                config.PROTO_FILE,
+            ]
+        )
+        if code != 0:
+            raise RuntimeError(f"protoc compilation failed (code={code})")
 
     sys.path.insert(0, out_dir)
     import discovery_pb2 as _m
@@ -57,22 +79,43 @@ def _load_proto():
 
 
 def _user_id_from_ctx(ctx: grpc.ServicerContext) -> str | None:
-    for key, val in ctx.invocation_metadata():
-        if key == "x-user-id":
-            return val
-    return None
+    return next((v for k, v in ctx.invocation_metadata() if k == "x-user-id"), None)
 
 
 async def _verify_search_config_ownership(
     pool, search_config_id: str, user_id: str
 ) -> bool:
     """Return True if the search config belongs to the user."""
+    key = (search_config_id, user_id)
+    if key in _owned_configs:
+        return True
     row = await pool.fetchrow(
         "SELECT id FROM search_configs WHERE id = $1 AND user_id = $2",
         search_config_id,
         user_id,
     )
-    return row is not None
+    if row is None:
+        return False
+    _owned_configs[key] = True
+    return True
+
+
+async def _insert_job_feed(pool, context, search_config_id: str | None, uid: str, sql: str, *args):
+    """
+    Run a job_feed INSERT for a search config whose ownership was verified,
+    possibly from _owned_configs. If the config has been deleted since, the
+    foreign key rejects the row: the cached answer is evicted and ownership
+    re-checked, so the caller gets NOT_FOUND rather than INTERNAL.
+    """
+    try:
+        return await pool.fetchrow(sql, *args)
+    except asyncpg.ForeignKeyViolationError:
+        if not search_config_id:
+            raise
+        _owned_configs.pop((search_config_id, uid), None)
+        if await _verify_search_config_ownership(pool, search_config_id, uid):
+            raise
+        await context.abort(grpc.StatusCode.NOT_FOUND, "search config not found")
 
 
 class DiscoveryServicer:
@@ -110,7 +153,7 @@ class DiscoveryServicer:
             job_data["company"] = company_name
 
         # Red-flag check
-        if scraper._has_red_flag(f"{job_data['title']} {job_data['description']}"):
+        if scraper._has_red_flag(job_data["title"], job_data["description"]):
             await context.abort(
                 grpc.StatusCode.FAILED_PRECONDITION, "job contains red-flag content"
             )
@@ -118,7 +161,11 @@ class DiscoveryServicer:
         # Insert into job_feed (idempotent per user + source_url)
         # Do not rely on ON CONFLICT(source_url): production DB may not have a
         # matching UNIQUE/EXCLUDE constraint and source_url is not globally unique.
-        row = await pool.fetchrow(
+        row = await _insert_job_feed(
+            pool,
+            context,
+            search_config_id,
+            uid,
             """
             WITH existing AS (
                 SELECT id
@@ -142,7 +189,7 @@ class DiscoveryServicer:
             uid,
             search_config_id,
             request.url,
-            json.dumps(job_data),
+            job_data,  # JSONB codec registered in database.py
             job_data.get("title"),
             job_data.get("description"),
         )
@@ -194,7 +241,11 @@ class DiscoveryServicer:
             "why_us": request.why_us,
         }
 
-        row = await pool.fetchrow(
+        row = await _insert_job_feed(
+            pool,
+            context,
+            search_config_id,
+            uid,
             """
             INSERT INTO job_feed
               (user_id, search_config_id, source_url, status, raw_data,
@@ -205,7 +256,7 @@ class DiscoveryServicer:
             uid,
             search_config_id,
             f"manual://{uid}/{request.company_name}",
-            json.dumps(raw_data),
+            raw_data,
             request.company_name,
             request.profile_wanted or None,
             request.company_name,
@@ -247,13 +298,7 @@ class DiscoveryServicer:
                            FROM search_configs WHERE user_id = $1 AND is_active = TRUE""",
                         user_filter,
                     )
-                    for row in rows:
-                        await scraper.run_for_config(
-                            str(row["id"]),
-                            str(row["user_id"]),
-                            list(row["job_titles"] or []),
-                            list(row["locations"] or []),
-                        )
+                    await scraper.run_configs(rows)
                 else:
                     await scraper.run_all()
             except Exception as exc:
@@ -0,0 +1,32 @@
+"""Shared outbound HTTP client for discovery-service (Adzuna API + URL scraping)."""
+
+from __future__ import annotations
+
+import httpx
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Lazily build the process-wide client. Reusing it keeps TCP/TLS sessions
+    alive across requests instead of paying a handshake per call; HTTP/2 lets
+    concurrent requests to the same host share one connection.
+    """
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=2,  # connection-level retries only
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            ),
+        )
+    return _client
+
+
+async def close() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
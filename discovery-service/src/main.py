@@ -6,12 +6,14 @@ import asyncio
 import logging
 
 import uvicorn
+import uvloop
 from fastapi import FastAPI
 from pythonjsonlogger import jsonlogger
 
 import config
 import database
 import grpc_server
+import http_client
 import scheduler
 
 
@@ -50,11 +52,15 @@ async def _main() -> None:
         extra={"http_port": config.HTTP_PORT, "grpc_port": config.GRPC_PORT},
     )
 
-    await asyncio.gather(
-        grpc_server.serve(),
-        http_server.serve(),
-    )
+    try:
+        await asyncio.gather(
+            grpc_server.serve(),
+            http_server.serve(),
+        )
+    finally:
+        await http_client.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(_main())
+    # libuv event loop: faster socket I/O for asyncpg, Redis, gRPC and HTTP
+    uvloop.run(_main())
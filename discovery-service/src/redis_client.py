@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import logging
+import time
 
 import redis.asyncio as aioredis
 
@@ -25,3 +26,53 @@ async def publish(channel: str, payload: dict) -> None:
         await get_client().publish(channel, json.dumps(payload))
     except Exception as exc:
         logger.warning("Redis publish failed channel=%s err=%s", channel, exc)
+
+
+async def publish_many(channel: str, payloads: list[dict]) -> None:
+    """Publish several messages to one channel in a single pipelined round-trip."""
+    if not payloads:
+        return
+    try:
+        async with get_client().pipeline(transaction=False) as pipe:
+            for payload in payloads:
+                pipe.publish(channel, json.dumps(payload))
+            await pipe.execute()
+    except Exception as exc:
+        logger.warning("Redis publish failed channel=%s err=%s", channel, exc)
+
+
+async def filter_unseen(key: str, members: list[str]) -> list[str]:
+    """
+    Return the members not currently in the Redis sorted set `key`.
+
+    Scores are expiry times (epoch seconds); expired members are pruned in the
+    same round trip before the ZMSCORE lookup. On Redis errors every member
+    is returned, so callers fall back to the DB.
+    """
+    if not members:
+        return []
+    try:
+        async with get_client().pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(key, "-inf", time.time())
+            pipe.zmscore(key, members)
+            _, scores = await pipe.execute()
+    except Exception as exc:
+        logger.warning("Redis seen-set lookup failed key=%s err=%s", key, exc)
+        return members
+    return [m for m, score in zip(members, scores, strict=True) if score is None]
+
+
+async def mark_seen(key: str, expiries: dict[str, float], ttl_seconds: int) -> None:
+    """
+    Add members to the Redis sorted set `key`, each scored with the epoch time
+    it stops counting as seen, and refresh the key's idle expiry.
+    """
+    if not expiries:
+        return
+    try:
+        async with get_client().pipeline(transaction=False) as pipe:
+            pipe.zadd(key, expiries)
+            pipe.expire(key, ttl_seconds)
+            await pipe.execute()
+    except Exception as exc:
+        logger.warning("Redis seen-set update failed key=%s err=%s", key, exc)
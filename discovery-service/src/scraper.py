@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import itertools
 import logging
+import re
 from dataclasses import dataclass, field
 
 import httpx
+import orjson
 
 import config
 import database
+import http_client
 import redis_client
 
 logger = logging.getLogger(__name__)
@@ -18,9 +22,31 @@ ADZUNA_BASE = "https://api.adzuna.com/v1/api/jobs"
 PAGE_SIZE = 50
 MAX_PAGES = 3
 HTTP_TIMEOUT = 15.0
+# Concurrent Adzuna requests across all pages / (title × location) searches
+MAX_CONCURRENT_REQUESTS = 8
+# Search configs scraped at the same time by run_configs
+MAX_CONCURRENT_CONFIGS = 4
 
+_request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
 
-@dataclass
+# Per-config Redis sorted set of source_urls already in job_feed, checked
+# before the insert so steady-state scrapes (mostly known URLs) barely touch
+# Postgres. Each URL is scored with its row's expires_at and pruned once that
+# passes, so after the cleanup cron deletes the row it is inserted again.
+SEEN_URLS_KEY = "discovery:seen_url_expiry:{}"
+# Drops the whole key once a config has not been scraped for this long
+SEEN_URLS_TTL_SECONDS = 30 * 24 * 3600
+
+# All red-flag keywords in one case-insensitive alternation: a single C-level
+# scan per posting, without lowercasing a copy of the description first.
+_RED_FLAG_RE = (
+    re.compile("|".join(map(re.escape, config.RED_FLAG_KEYWORDS)), re.IGNORECASE)
+    if config.RED_FLAG_KEYWORDS
+    else None
+)
+
+
+@dataclass(slots=True)
 class JobResult:
     external_id: str
     title: str
@@ -33,9 +59,10 @@ class JobResult:
     raw_data: dict = field(default_factory=dict)
 
 
-def _has_red_flag(text: str) -> bool:
-    lower = text.lower()
-    return any(kw in lower for kw in config.RED_FLAG_KEYWORDS)
+def _has_red_flag(*texts: str) -> bool:
+    # Each text is searched in place (case-insensitive regex), so neither a
+    # lowercased nor a concatenated copy of the job text is built.
+    return _RED_FLAG_RE is not None and any(_RED_FLAG_RE.search(text) is not None for text in texts)
 
 
 async def _fetch_page(
@@ -54,7 +81,8 @@ async def _fetch_page(
     }
     url = f"{ADZUNA_BASE}/{config.ADZUNA_COUNTRY}/search/{page}"
     try:
-        resp = await client.get(url, params=params, timeout=HTTP_TIMEOUT)
+        async with _request_slots:
+            resp = await client.get(url, params=params, timeout=HTTP_TIMEOUT)
         resp.raise_for_status()
         data = resp.json()
     except Exception as exc:
@@ -79,53 +107,81 @@ async def _fetch_page(
     return results
 
 
-async def _fetch_all(job_title: str, location: str) -> list[JobResult]:
-    async with httpx.AsyncClient() as client:
-        results: list[JobResult] = []
-        for page in range(1, MAX_PAGES + 1):
-            batch = await _fetch_page(client, job_title, location, page)
-            results.extend(batch)
-            if len(batch) < PAGE_SIZE:
-                break
+async def _fetch_all(client: httpx.AsyncClient, job_title: str, location: str) -> list[JobResult]:
+    # Page 1 alone first: a short page means there is nothing further to
+    # fetch, so small searches cost one request. Otherwise the remaining
+    # pages are requested together.
+    results = await _fetch_page(client, job_title, location, 1)
+    if len(results) < PAGE_SIZE:
         return results
 
+    pages = await asyncio.gather(
+        *(_fetch_page(client, job_title, location, page) for page in range(2, MAX_PAGES + 1))
+    )
+    results.extend(itertools.chain.from_iterable(pages))
+    return results
+
+
+# One round-trip for a whole scrape: the jobs arrive as parallel arrays,
+# duplicates inside the batch keep their first occurrence, and rows whose
+# source_url is already in the config's feed are skipped.
+_INSERT_JOBS_SQL = """
+    WITH j AS (
+        SELECT DISTINCT ON (source_url) *
+        FROM unnest($3::text[], $4::text[], $5::text[], $6::text[], $7::text[])
+             WITH ORDINALITY AS t(title, source_url, description, raw_data, company_name, ord)
+        ORDER BY source_url, ord
+    ),
+    existing AS (
+        SELECT jf.source_url, MAX(jf.expires_at) AS expires_at
+        FROM job_feed jf
+        JOIN j ON j.source_url = jf.source_url
+        WHERE jf.search_config_id = $1
+        GROUP BY jf.source_url
+    ),
+    inserted AS (
+        INSERT INTO job_feed
+            (user_id, search_config_id, title, description, source_url,
+             status, raw_data, company_name, is_manual)
+        SELECT $2, $1, j.title, j.description, j.source_url,
+               'PENDING', j.raw_data::jsonb, j.company_name, FALSE
+        FROM j
+        WHERE NOT EXISTS (SELECT 1 FROM existing e WHERE e.source_url = j.source_url)
+        RETURNING id, source_url, expires_at
+    )
+    SELECT id, source_url, expires_at FROM inserted
+    UNION ALL
+    SELECT NULL, source_url, expires_at FROM existing
+"""
+
 
-async def _upsert_job(
+async def _insert_jobs(
     pool,
-    job: JobResult,
+    jobs: list[JobResult],
     search_config_id: str | None,
     user_id: str,
-) -> str | None:
+) -> tuple[list[str], dict[str, float]]:
     """
-    Insert a job into job_feed, skipping if the source_url already exists.
-    Returns the new job_feed row id, or None if skipped.
+    Insert jobs into job_feed, skipping any whose source_url already exists.
+    Returns the ids of the new job_feed rows, and the expires_at (epoch
+    seconds) of the job_feed row behind every given source_url.
     """
-    row = await pool.fetchrow(
-        """
-        WITH existing AS (
-            SELECT id
-            FROM job_feed
-            WHERE search_config_id = $1
-              AND source_url = $4
-            LIMIT 1
-        )
-                INSERT INTO job_feed
-                    (user_id, search_config_id, title, description, source_url,
-                     status, raw_data, company_name, is_manual)
-                SELECT $2, $1, $3, $5, $4,
-                             'PENDING', $6, $7, FALSE
-                WHERE NOT EXISTS (SELECT 1 FROM existing)
-                RETURNING id
-        """,
+    if not jobs:
+        return [], {}
+    rows = await pool.fetch(
+        _INSERT_JOBS_SQL,
         search_config_id,
         user_id,
-        (job.title or "").strip() or "Untitled job",
-        job.source_url,
-        job.description or "",
-        json.dumps(job.raw_data),
-        job.company_name or None,
+        [(job.title or "").strip() or "Untitled job" for job in jobs],
+        [job.source_url for job in jobs],
+        [job.description or "" for job in jobs],
+        # text[] cast to jsonb in SQL, so the array bypasses the JSONB codec
+        [orjson.dumps(job.raw_data).decode() for job in jobs],
+        [job.company_name or None for job in jobs],
     )
-    return str(row["id"]) if row else None
+    job_ids = [str(row["id"]) for row in rows if row["id"] is not None]
+    expiries = {row["source_url"]: row["expires_at"].timestamp() for row in rows}
+    return job_ids, expiries
 
 
 async def run_for_config(
@@ -136,30 +192,37 @@ async def run_for_config(
     Returns the number of new jobs inserted.
     """
     pool = await database.get_pool()
-    inserted = 0
-
-    for title in job_titles:
-        for location in locations:
-            jobs = await _fetch_all(title, location)
-            for job in jobs:
-                combined = f"{job.title} {job.description}"
-                if _has_red_flag(combined):
-                    logger.debug("Red flag filtered: %s", job.title)
-                    continue
-                jid = await _upsert_job(pool, job, search_config_id, user_id)
-                if jid:
-                    inserted += 1
-                    await redis_client.publish(
-                        "EVENT_JOB_DISCOVERED",
-                        {
-                            "jobFeedId": jid,
-                            "userId": user_id,
-                            "searchConfigId": search_config_id,
-                        },
-                    )
-
-    logger.info("Scrape done config=%s inserted=%d", search_config_id, inserted)
-    return inserted
+
+    # Fetch every (title × location) search concurrently
+    client = http_client.get_client()
+    searches = await asyncio.gather(
+        *(_fetch_all(client, title, location) for title in job_titles for location in locations)
+    )
+
+    jobs: list[JobResult] = []
+    for job in itertools.chain.from_iterable(searches):
+        if _has_red_flag(job.title, job.description):
+            logger.debug("Red flag filtered: %s", job.title)
+            continue
+        jobs.append(job)
+
+    seen_key = SEEN_URLS_KEY.format(search_config_id)
+    unseen = set(await redis_client.filter_unseen(seen_key, [j.source_url for j in jobs]))
+    jobs = [j for j in jobs if j.source_url in unseen]
+
+    job_ids, expiries = await _insert_jobs(pool, jobs, search_config_id, user_id)
+    # Every remaining URL is now in job_feed; remember it until its row expires
+    await redis_client.mark_seen(seen_key, expiries, SEEN_URLS_TTL_SECONDS)
+    await redis_client.publish_many(
+        "EVENT_JOB_DISCOVERED",
+        [
+            {"jobFeedId": jid, "userId": user_id, "searchConfigId": search_config_id}
+            for jid in job_ids
+        ],
+    )
+
+    logger.info("Scrape done config=%s inserted=%d", search_config_id, len(job_ids))
+    return len(job_ids)
 
 
 async def run_all() -> None:
@@ -174,10 +237,27 @@ async def run_all() -> None:
         """,
     )
     logger.info("Scheduled scrape: %d active configs", len(rows))
-    for row in rows:
-        await run_for_config(
-            search_config_id=str(row["id"]),
-            user_id=str(row["user_id"]),
-            job_titles=list(row["job_titles"] or []),
-            locations=list(row["locations"] or []),
-        )
+    await run_configs(rows)
+
+
+async def run_configs(rows) -> None:
+    """
+    Scrape several search configs (rows with id, user_id, job_titles,
+    locations), up to MAX_CONCURRENT_CONFIGS at a time. A failing config is
+    logged and does not stop the others.
+    """
+    slots = asyncio.Semaphore(MAX_CONCURRENT_CONFIGS)
+
+    async def _one(row) -> None:
+        async with slots:
+            try:
+                await run_for_config(
+                    search_config_id=str(row["id"]),
+                    user_id=str(row["user_id"]),
+                    job_titles=list(row["job_titles"] or []),
+                    locations=list(row["locations"] or []),
+                )
+            except Exception as exc:
+                logger.error("Scrape failed config=%s: %s", row["id"], exc)
+
+    await asyncio.gather(*(_one(row) for row in rows))
@@ -1,17 +1,23 @@
-"""URL scraper: fetch a job page and extract structured data using BeautifulSoup."""
+"""URL scraper: fetch a job page and extract structured data with selectolax."""
 
 from __future__ import annotations
 
 import logging
-import re
 
-import httpx
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+
+import http_client
 
 logger = logging.getLogger(__name__)
 
 HTTP_TIMEOUT = 20.0
 MAX_DESC_LEN = 5000
+# Download cap per page; real job pages are far smaller, anything beyond is
+# truncated rather than buffered and parsed in full.
+MAX_HTML_BYTES = 2_000_000
+
+# Elements whose text is not visible page content (skipped by every lookup)
+_INVISIBLE_TAGS = ["script", "style"]
 
 
 async def extract_job_from_url(url: str) -> dict:
@@ -21,12 +27,30 @@ async def extract_job_from_url(url: str) -> dict:
     Falls back to empty strings on failure.
     """
     try:
-        async with httpx.AsyncClient(
-            follow_redirects=True, timeout=HTTP_TIMEOUT
-        ) as client:
-            resp = await client.get(url, headers={"User-Agent": "JobmateBot/1.0"})
+        async with http_client.get_client().stream(
+            "GET",
+            url,
+            headers={"User-Agent": "JobmateBot/1.0"},
+            follow_redirects=True,
+            timeout=HTTP_TIMEOUT,
+        ) as resp:
             resp.raise_for_status()
-            html = resp.text
+            content_type = resp.headers.get("content-type", "")
+            if content_type and "html" not in content_type:
+                logger.warning("URL is not HTML url=%s content-type=%s", url, content_type)
+                return _empty(url)
+
+            chunks: list[bytes] = []
+            total = 0
+            async for chunk in resp.aiter_bytes(65536):
+                chunks.append(chunk)
+                total += len(chunk)
+                if total >= MAX_HTML_BYTES:
+                    logger.info("Truncated page at %d bytes url=%s", MAX_HTML_BYTES, url)
+                    break
+            html = b"".join(chunks)[:MAX_HTML_BYTES].decode(
+                resp.charset_encoding or "utf-8", errors="replace"
+            )
     except Exception as exc:
         logger.warning("URL fetch failed url=%s err=%s", url, exc)
         return _empty(url)
@@ -39,36 +63,33 @@ async def extract_job_from_url(url: str) -> dict:
 
 
 def _parse(html: str, url: str) -> dict:
-    soup = BeautifulSoup(html, "lxml")
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(_INVISIBLE_TAGS)
 
     # Title: prefer og:title > <title> > h1
-    title = _meta(soup, "og:title") or _text(soup, "title") or _text(soup, "h1") or ""
+    title = _meta(tree, "og:title") or _text(tree, "title") or _text(tree, "h1")
     title = _clean(title)[:200]
 
     # Company: common selectors used by job boards
     company = (
-        _meta(soup, "og:site_name")
-        or _attr(soup, "[itemprop='hiringOrganization'] [itemprop='name']", "content")
-        or _text(soup, "[itemprop='hiringOrganization']")
-        or ""
+        _meta(tree, "og:site_name")
+        or _attr(tree, "[itemprop='hiringOrganization'] [itemprop='name']", "content")
+        or _text(tree, "[itemprop='hiringOrganization']")
     )
     company = _clean(company)[:200]
 
     # Location
-    location = (
-        _attr(soup, "[itemprop='jobLocation']", "content")
-        or _text(soup, "[itemprop='jobLocation']")
-        or ""
+    location = _attr(tree, "[itemprop='jobLocation']", "content") or _text(
+        tree, "[itemprop='jobLocation']"
     )
     location = _clean(location)[:200]
 
     # Description: og:description > itemprop > <article> > <main>
     description = (
-        _meta(soup, "og:description")
-        or _text(soup, "[itemprop='description']")
-        or _text(soup, "article")
-        or _text(soup, "main")
-        or ""
+        _meta(tree, "og:description")
+        or _text(tree, "[itemprop='description']")
+        or _text(tree, "article")
+        or _text(tree, "main")
     )
     description = _clean(description)[:MAX_DESC_LEN]
 
@@ -92,19 +113,22 @@ def _empty(url: str) -> dict:
 
 
 def _clean(s: str) -> str:
-    return re.sub(r"\s+", " ", s).strip()
+    # str.split() with no argument splits on any whitespace run in one C pass
+    return " ".join(s.split())
 
 
-def _meta(soup: BeautifulSoup, prop: str) -> str:
-    tag = soup.find("meta", property=prop) or soup.find("meta", attrs={"name": prop})
-    return (tag.get("content") or "") if tag else ""
+def _meta(tree: LexborHTMLParser, prop: str) -> str:
+    """Content of <meta property=prop>, else of <meta name=prop>."""
+    return _attr(tree, f'meta[property="{prop}"]', "content") or _attr(
+        tree, f'meta[name="{prop}"]', "content"
+    )
 
 
-def _text(soup: BeautifulSoup, selector: str) -> str:
-    tag = soup.select_one(selector)
-    return tag.get_text(separator=" ") if tag else ""
+def _attr(tree: LexborHTMLParser, selector: str, name: str) -> str:
+    node = tree.css_first(selector)
+    return (node.attributes.get(name) or "") if node is not None else ""
 
 
-def _attr(soup: BeautifulSoup, selector: str, attr: str) -> str:
-    tag = soup.select_one(selector)
-    return (tag.get(attr) or "") if tag else ""
+def _text(tree: LexborHTMLParser, selector: str) -> str:
+    node = tree.css_first(selector)
+    return node.text(deep=True, separator=" ") if node is not None else ""
@@ -5,8 +5,10 @@
  *  - `publisher`  : used by resolvers to emit commands (CMD_ANALYZE_JOB, etc.)
  *  - `subscriber` : long-lived connection listening for events (EVENT_ANALYSIS_DONE, etc.)
  *
+ * Streams (XADD, consumed by a consumer group — survives consumer restarts):
+ *   CMD_ANALYZE_JOB   → field `payload`: { applicationId, userId }
+ *
  * Channels:
- *   CMD_ANALYZE_JOB   → payload: { applicationId, userId }
  *   EVENT_ANALYSIS_DONE → payload: { applicationId, userId }
  */
 
@@ -37,3 +39,17 @@ console.log('[redis:subscriber] Connected.');
  */
 export const publish = (channel, payload) =>
   publisher.publish(channel, JSON.stringify(payload));
+
+/**
+ * Append a command to a Redis Stream (at-least-once delivery to the consumer group).
+ * The stream is capped at ~10k entries so acknowledged commands do not pile up.
+ * @param {string} stream  - e.g. 'CMD_ANALYZE_JOB'
+ * @param {object} payload - will be JSON-serialized into the `payload` field
+ */
+export const enqueue = (stream, payload) =>
+  publisher.xAdd(
+    stream,
+    '*',
+    { payload: JSON.stringify(payload) },
+    { TRIM: { strategy: 'MAXLEN', strategyModifier: '~', threshold: 10000 } }
+  );
@@ -84,7 +84,7 @@ export async function listApplications(userId, statusFilter = '') {
 
 /**
  * Create a new application for the given job feed entry.
- * The tracker-service handles idempotency and publishes CMD_ANALYZE_JOB.
+ * The tracker-service handles idempotency and enqueues CMD_ANALYZE_JOB.
  * @param {string} userId
  * @param {string} jobFeedId
  * @returns {Promise<object>} created ApplicationProto
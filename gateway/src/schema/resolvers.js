@@ -10,7 +10,7 @@ import { GraphQLError } from 'graphql';
 import { GraphQLJSON } from 'graphql-scalars';
 import GraphQLUpload from 'graphql-upload/GraphQLUpload.mjs';
 import { query } from '../lib/db.js';
-import { publish } from '../lib/redis.js';
+import { enqueue } from '../lib/redis.js';
 import { signToken, requireAuth } from '../middleware/auth.js';
 import * as trackerClient from '../lib/trackerGrpc.js';
 import * as userClient from '../lib/userGrpc.js';
@@ -447,13 +447,13 @@ export const resolvers = {
 
       const app = appRows[0];
 
-      // 4. Publish CMD_ANALYZE_JOB → ai-coach-service via Redis
+      // 4. Enqueue CMD_ANALYZE_JOB → ai-coach-service via Redis Stream
       try {
-        await publish('CMD_ANALYZE_JOB', { applicationId: app.id, userId });
-        console.log(`[approveJob] Published CMD_ANALYZE_JOB for application ${app.id}`);
+        await enqueue('CMD_ANALYZE_JOB', { applicationId: app.id, userId });
+        console.log(`[approveJob] Enqueued CMD_ANALYZE_JOB for application ${app.id}`);
       } catch (err) {
         // Non-fatal: analysis will be triggered on next retry mechanism
-        console.error('[approveJob] Failed to publish CMD_ANALYZE_JOB:', err.message);
+        console.error('[approveJob] Failed to enqueue CMD_ANALYZE_JOB:', err.message);
       }
 
       // 5. Return Application shape
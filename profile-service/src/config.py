@@ -4,6 +4,8 @@ import os
 
 DATABASE_URL: str = os.environ["DATABASE_URL"]
 REDIS_URL: str = os.getenv("REDIS_URL", "redis://redis:6379")
+# Connections in the Redis pool; callers wait for a free one beyond this.
+REDIS_POOL_SIZE: int = int(os.getenv("REDIS_POOL_SIZE", "32"))
 HTTP_PORT: int = int(os.getenv("HTTP_PORT", "4001"))
 GRPC_PORT: int = int(os.getenv("GRPC_PORT", "9081"))
 
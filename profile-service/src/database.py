@@ -26,7 +26,14 @@ async def _create_pool(retries: int = 10, delay: float = 2.0) -> asyncpg.Pool:
     for attempt in range(1, retries + 1):
         try:
             pool = await asyncpg.create_pool(
-                config.DATABASE_URL, min_size=2, max_size=10
+                config.DATABASE_URL,
+                min_size=2,
+                max_size=10,
+                # Every handler runs constant SQL, so each statement is prepared
+                # once per connection and then reused; keep them for the
+                # connection's lifetime rather than asyncpg's 300 s default.
+                statement_cache_size=100,
+                max_cached_statement_lifetime=0,
             )
             logger.info("Database pool created")
             return pool
@@ -2,14 +2,17 @@
 
 from __future__ import annotations
 
-import json
+import functools
 import logging
 import os
-import uuid
+import secrets
+from collections.abc import Awaitable, Callable, Mapping
 from datetime import UTC, date, datetime
+from typing import Any
 
+import aiofiles
 import grpc
-from google.protobuf import timestamp_pb2
+from google.protobuf.internal import api_implementation
 from grpc import aio
 from grpc_reflection.v1alpha import reflection
 
@@ -20,7 +23,7 @@ import redis_client
 logger = logging.getLogger(__name__)
 
 # ─── Proto loading ────────────────────────────────────────────────────────────
-# Loaded lazily after grpc_tools path is set up
+# Loaded lazily by _load_proto()
 _pb2 = None
 _pb2_grpc = None
 
@@ -35,33 +38,47 @@ def _parse_date(s: str | None) -> date | None:
         return None
 
 
+PROTO_OUT_DIR = "/tmp/profile_service_proto"
+
+
+def _stubs_up_to_date(out_dir: str) -> bool:
+    proto_mtime = os.path.getmtime(config.PROTO_FILE)
+    for name in ("user_pb2.py", "user_pb2_grpc.py"):
+        path = os.path.join(out_dir, name)
+        if not os.path.exists(path) or os.path.getmtime(path) < proto_mtime:
+            return False
+    return True
+
+
 def _load_proto():
-    """Dynamically load generated proto modules from user.proto."""
+    """Load the generated proto modules for user.proto, running protoc if needed."""
     global _pb2, _pb2_grpc
     if _pb2 is not None:
         return
     import sys
 
-    import grpc_tools
-    from grpc_tools import protoc
-
-    out_dir = "/tmp/profile_service_proto"
+    out_dir = PROTO_OUT_DIR
     os.makedirs(out_dir, exist_ok=True)
 
-    proto_include = os.path.join(os.path.dirname(grpc_tools.__file__), "_proto")
-
-    code = protoc.main(
-        [
-            "grpc_tools.protoc",
-            f"--proto_path={config.PROTO_DIR}",
-            f"--proto_path={proto_include}",
-            f"--python_out={out_dir}",
-            f"--grpc_python_out={out_dir}",
-            config.PROTO_FILE,
-        ]
-    )
-    if code != 0:
-        raise RuntimeError(f"protoc compilation failed (code={code})")
+    # The image pre-generates the stubs at build time; only run protoc when
+    # they are missing or older than the proto (e.g. a dev-mounted PROTO_DIR).
+    if not _stubs_up_to_date(out_dir):
+        import grpc_tools
+        from grpc_tools import protoc
+
+        proto_include = os.path.join(os.path.dirname(grpc_tools.__file__), "_proto")
+        code = protoc.main(
+            [
+                "grpc_tools.protoc",
+                f"--proto_path={config.PROTO_DIR}",
+                f"--proto_path={proto_include}",
+                f"--python_out={out_dir}",
+                f"--grpc_python_out={out_dir}",
+                config.PROTO_FILE,
+            ]
+        )
+        if code != 0:
+            raise RuntimeError(f"protoc compilation failed (code={code})")
 
     sys.path.insert(0, out_dir)
     import user_pb2 as _m
@@ -70,43 +87,97 @@ def _load_proto():
     _pb2 = _m
     _pb2_grpc = _g
 
+    # protobuf 5.x builds messages in its upb C extension; the pure-Python
+    # fallback (e.g. PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION=python) is many
+    # times slower for message-heavy responses such as GetSearchConfigs.
+    impl = api_implementation.Type()
+    if impl == "python":
+        logger.warning("protobuf is using the pure-Python implementation")
+    else:
+        logger.info("protobuf implementation: %s", impl)
+
 
 # ─── Helpers ─────────────────────────────────────────────────────────────────
 
 
-def _ts(dt: datetime | None) -> timestamp_pb2.Timestamp:
-    ts = timestamp_pb2.Timestamp()
-    if dt:
-        ts.FromDatetime(dt.replace(tzinfo=UTC) if dt.tzinfo is None else dt)
-    return ts
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def _ts(dt: datetime | None) -> dict[str, int]:
+    """
+    Timestamp field value for dt (naive values are UTC), as a dict of exact
+    integer seconds/nanos. The parent message fills its own Timestamp from
+    it, so no standalone Timestamp is built and copied in.
+    """
+    if dt is None:
+        return {}
+    delta = (dt if dt.tzinfo is not None else dt.replace(tzinfo=UTC)) - _EPOCH
+    return {"seconds": delta.days * 86400 + delta.seconds, "nanos": delta.microseconds * 1000}
 
 
 def _user_id_from_ctx(ctx: grpc.ServicerContext) -> str | None:
-    for key, val in ctx.invocation_metadata():
-        if key == "x-user-id":
-            return val
-    return None
+    return next((v for k, v in ctx.invocation_metadata() if k == "x-user-id"), None)
+
 
+def _authenticated(handler: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Wrap an RPC handler: abort UNAUTHENTICATED without x-user-id, else pass it as uid."""
 
-def _row_to_search_config_proto(row: dict) -> object:
-    sc = _pb2.SearchConfigProto(
+    @functools.wraps(handler)
+    async def wrapper(self, request, context):
+        uid = _user_id_from_ctx(context)
+        if not uid:
+            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "missing x-user-id")
+        return await handler(self, request, context, uid)
+
+    return wrapper
+
+
+# Columns every search_configs query selects or returns for _search_config_fields
+_SEARCH_CONFIG_COLUMNS = """id, job_titles, locations, remote_policy, keywords, red_flags,
+                         salary_min, salary_max, is_active, start_date, duration,
+                         cover_letter_template, created_at, updated_at"""
+
+
+def _search_config_fields(row: Mapping[str, Any]) -> dict[str, Any]:
+    """SearchConfigProto field values for a row holding _SEARCH_CONFIG_COLUMNS."""
+    # All columns are always present, so plain subscripts; only the nullable
+    # ones need a fallback. asyncpg already decodes text[] columns to lists,
+    # and repeated fields passed as keyword values are filled in one C call.
+    start_date = row["start_date"]
+    return dict(
         id=str(row["id"]),
-        remote_policy=row.get("remote_policy") or "",
-        salary_min=row.get("salary_min") or 0,
-        salary_max=row.get("salary_max") or 0,
-        is_active=row.get("is_active", True),
-        start_date=str(row["start_date"]) if row.get("start_date") else "",
-        duration=row.get("duration") or "",
-        cover_letter_template=row.get("cover_letter_template") or "",
-        created_at=_ts(row.get("created_at")),
-        updated_at=_ts(row.get("updated_at")),
+        job_titles=row["job_titles"],
+        locations=row["locations"],
+        keywords=row["keywords"],
+        red_flags=row["red_flags"],
+        remote_policy=row["remote_policy"],
+        salary_min=row["salary_min"] or 0,
+        salary_max=row["salary_max"] or 0,
+        is_active=row["is_active"],
+        start_date=str(start_date) if start_date else "",
+        duration=row["duration"] or "",
+        cover_letter_template=row["cover_letter_template"] or "",
+        created_at=_ts(row["created_at"]),
+        updated_at=_ts(row["updated_at"]),
     )
-    for f in ("job_titles", "locations", "keywords", "red_flags"):
-        vals = row.get(f) or []
-        if isinstance(vals, str):
-            vals = json.loads(vals)
-        getattr(sc, f).extend(vals)
-    return sc
+
+
+def _row_to_search_config_proto(row: Mapping[str, Any]) -> object:
+    return _pb2.SearchConfigProto(**_search_config_fields(row))
+
+
+@functools.cache
+def _update_search_config_sql(columns: tuple[str, ...]) -> str:
+    """
+    UPDATE statement setting only the given search_configs columns ($3, $4, …).
+
+    Cached per column combination, so the SQL text is identical for repeat
+    updates of the same fields and hits asyncpg's prepared-statement cache.
+    """
+    assignments = "".join(f"{col} = ${i}, " for i, col in enumerate(columns, start=3))
+    return f"""UPDATE search_configs SET {assignments}updated_at = NOW()
+               WHERE id = $1 AND user_id = $2
+               RETURNING {_SEARCH_CONFIG_COLUMNS}"""
 
 
 # ─── Servicer ─────────────────────────────────────────────────────────────────
@@ -117,15 +188,15 @@ class ProfileServicer:
 
     # ── Profile ────────────────────────────────────────────────────────────────
 
-    async def GetProfile(self, request, context):
-        uid = _user_id_from_ctx(context)
-        if not uid:
-            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "missing x-user-id")
+    @_authenticated
+    async def GetProfile(self, request, context, uid: str):
         pool = await database.get_pool()
+        # No jsonb codec is registered, so asyncpg returns the *_json columns
+        # as JSON text, which is exactly what the proto's string fields carry.
         row = await pool.fetchrow(
             """SELECT id, user_id, full_name, status,
-                      skills_json::text, experience_json::text, projects_json::text,
-                      education_json::text, certifications_json::text, cv_url,
+                      skills_json, experience_json, projects_json,
+                      education_json, certifications_json, cv_url,
                       created_at, updated_at
                FROM profiles WHERE user_id = $1""",
             uid,
@@ -149,26 +220,23 @@ class ProfileServicer:
 
     # ── SearchConfig CRUD ──────────────────────────────────────────────────────
 
-    async def GetSearchConfigs(self, request, context):
-        uid = _user_id_from_ctx(context)
-        if not uid:
-            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "missing x-user-id")
+    @_authenticated
+    async def GetSearchConfigs(self, request, context, uid: str):
         pool = await database.get_pool()
         rows = await pool.fetch(
-            """SELECT id, job_titles, locations, remote_policy, keywords, red_flags,
-                      salary_min, salary_max, is_active, start_date, duration,
-                      cover_letter_template, created_at, updated_at
+            f"""SELECT {_SEARCH_CONFIG_COLUMNS}
                FROM search_configs WHERE user_id = $1 ORDER BY created_at DESC""",
             uid,
         )
-        return _pb2.GetSearchConfigsResponse(
-            configs=[_row_to_search_config_proto(dict(r)) for r in rows]
-        )
-
-    async def CreateSearchConfig(self, request, context):
-        uid = _user_id_from_ctx(context)
-        if not uid:
-            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "missing x-user-id")
+        # add() builds each config inside the response; passing a list of
+        # standalone messages would copy every one of them in.
+        resp = _pb2.GetSearchConfigsResponse()
+        for r in rows:
+            resp.configs.add(**_search_config_fields(r))
+        return resp
+
+    @_authenticated
+    async def CreateSearchConfig(self, request, context, uid: str):
         if not request.job_titles or not request.locations:
             await context.abort(
                 grpc.StatusCode.INVALID_ARGUMENT,
@@ -176,13 +244,11 @@ class ProfileServicer:
             )
         pool = await database.get_pool()
         row = await pool.fetchrow(
-            """INSERT INTO search_configs
+            f"""INSERT INTO search_configs
                  (user_id, job_titles, locations, remote_policy, keywords, red_flags,
                   salary_min, salary_max, start_date, duration, cover_letter_template)
                VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11)
-               RETURNING id, job_titles, locations, remote_policy, keywords, red_flags,
-                         salary_min, salary_max, is_active, start_date, duration,
-                         cover_letter_template, created_at, updated_at""",
+               RETURNING {_SEARCH_CONFIG_COLUMNS}""",
             uid,
             list(request.job_titles),
             list(request.locations),
@@ -195,51 +261,47 @@ class ProfileServicer:
             request.duration or None,
             request.cover_letter_template or None,
         )
-        return _row_to_search_config_proto(dict(row))
+        return _row_to_search_config_proto(row)
+
+    @_authenticated
+    async def UpdateSearchConfig(self, request, context, uid: str):
+        # Only the fields the client sent (non-empty / non-zero) are written
+        changes: dict[str, Any] = {}
+        if request.job_titles:
+            changes["job_titles"] = list(request.job_titles)
+        if request.locations:
+            changes["locations"] = list(request.locations)
+        if request.remote_policy:
+            changes["remote_policy"] = request.remote_policy
+        if request.keywords:
+            changes["keywords"] = list(request.keywords)
+        if request.red_flags:
+            changes["red_flags"] = list(request.red_flags)
+        if request.salary_min:
+            changes["salary_min"] = request.salary_min
+        if request.salary_max:
+            changes["salary_max"] = request.salary_max
+        start_date = _parse_date(request.start_date)
+        if start_date:
+            changes["start_date"] = start_date
+        if request.duration:
+            changes["duration"] = request.duration
+        if request.cover_letter_template:
+            changes["cover_letter_template"] = request.cover_letter_template
 
-    async def UpdateSearchConfig(self, request, context):
-        uid = _user_id_from_ctx(context)
-        if not uid:
-            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "missing x-user-id")
         pool = await database.get_pool()
         row = await pool.fetchrow(
-            """UPDATE search_configs SET
-                 job_titles          = CASE WHEN $3::text[] IS NOT NULL THEN $3 ELSE job_titles END,
-                 locations           = CASE WHEN $4::text[] IS NOT NULL THEN $4 ELSE locations END,
-                 remote_policy       = COALESCE(NULLIF($5,''), remote_policy),
-                 keywords            = CASE WHEN $6::text[] IS NOT NULL THEN $6 ELSE keywords END,
-                 red_flags           = CASE WHEN $7::text[] IS NOT NULL THEN $7 ELSE red_flags END,
-                 salary_min          = CASE WHEN $8 <> 0 THEN $8 ELSE salary_min END,
-                 salary_max          = CASE WHEN $9 <> 0 THEN $9 ELSE salary_max END,
-                 start_date          = COALESCE($10, start_date),
-                 duration            = COALESCE(NULLIF($11,''), duration),
-                 cover_letter_template = COALESCE(NULLIF($12,''), cover_letter_template),
-                 updated_at          = NOW()
-               WHERE id = $1 AND user_id = $2
-               RETURNING id, job_titles, locations, remote_policy, keywords, red_flags,
-                         salary_min, salary_max, is_active, start_date, duration,
-                         cover_letter_template, created_at, updated_at""",
+            _update_search_config_sql(tuple(changes)),
             request.id,
             uid,
-            list(request.job_titles) if request.job_titles else None,
-            list(request.locations) if request.locations else None,
-            request.remote_policy,
-            list(request.keywords) if request.keywords else None,
-            list(request.red_flags) if request.red_flags else None,
-            request.salary_min,
-            request.salary_max,
-            _parse_date(request.start_date),
-            request.duration,
-            request.cover_letter_template,
+            *changes.values(),
         )
         if not row:
             await context.abort(grpc.StatusCode.NOT_FOUND, "search config not found")
-        return _row_to_search_config_proto(dict(row))
+        return _row_to_search_config_proto(row)
 
-    async def DeleteSearchConfig(self, request, context):
-        uid = _user_id_from_ctx(context)
-        if not uid:
-            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "missing x-user-id")
+    @_authenticated
+    async def DeleteSearchConfig(self, request, context, uid: str):
         pool = await database.get_pool()
         result = await pool.execute(
             "DELETE FROM search_configs WHERE id = $1 AND user_id = $2",
@@ -251,10 +313,8 @@ class ProfileServicer:
 
     # ── CV ─────────────────────────────────────────────────────────────────────
 
-    async def UploadCV(self, request, context):
-        uid = _user_id_from_ctx(context)
-        if not uid:
-            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "missing x-user-id")
+    @_authenticated
+    async def UploadCV(self, request, context, uid: str):
         if not request.file_bytes:
             await context.abort(
                 grpc.StatusCode.INVALID_ARGUMENT, "file_bytes is required"
@@ -268,11 +328,11 @@ class ProfileServicer:
                 grpc.StatusCode.INVALID_ARGUMENT, "only PDF files are accepted"
             )
 
-        os.makedirs(config.UPLOAD_DIR, exist_ok=True)
-        safe_name = f"{uid}-{uuid.uuid4().hex}.pdf"
+        safe_name = f"{uid}-{secrets.token_hex(16)}.pdf"
         file_path = os.path.join(config.UPLOAD_DIR, safe_name)
-        with open(file_path, "wb") as f:
-            f.write(request.file_bytes)
+        # Up to MAX_UPLOAD_BYTES of disk I/O: run it off the event loop
+        async with aiofiles.open(file_path, "wb") as f:
+            await f.write(request.file_bytes)
 
         cv_url = f"/uploads/{safe_name}"
         pool = await database.get_pool()
@@ -283,20 +343,20 @@ class ProfileServicer:
         )
         return _pb2.UploadCVResponse(cv_url=cv_url, message="CV uploaded successfully")
 
-    async def ParseCV(self, request, context):
-        uid = _user_id_from_ctx(context)
-        if not uid:
-            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "missing x-user-id")
+    @_authenticated
+    async def ParseCV(self, request, context, uid: str):
         if not request.cv_url:
             await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "cv_url is required")
 
-        await redis_client.publish(
+        queued = await redis_client.enqueue(
             "CMD_PARSE_CV",
             {
                 "userId": uid,
                 "cvUrl": request.cv_url,
             },
         )
+        if not queued:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, "could not queue CV parsing")
         return _pb2.ParseCVResponse(success=True, message="CV parsing queued")
 
 
@@ -305,9 +365,15 @@ class ProfileServicer:
 
 async def serve():
     _load_proto()
+    os.makedirs(config.UPLOAD_DIR, exist_ok=True)
 
     servicer = ProfileServicer()
-    server = aio.server()
+    # gRPC's default 4 MiB receive limit would reject CVs the 10 MB upload cap
+    # allows; size it to the cap (plus room for the other fields) so larger
+    # messages are refused by gRPC before Python allocates them.
+    server = aio.server(
+        options=[("grpc.max_receive_message_length", config.MAX_UPLOAD_BYTES + 64 * 1024)]
+    )
     _pb2_grpc.add_ProfileServiceServicer_to_server(servicer, server)
 
     # Enable gRPC reflection (useful for debugging with grpcurl)
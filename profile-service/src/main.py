@@ -4,6 +4,7 @@ import asyncio
 import logging
 
 import uvicorn
+import uvloop
 from fastapi import FastAPI
 from pythonjsonlogger import jsonlogger
 
@@ -67,4 +68,5 @@ async def _main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(_main())
+    # libuv event loop: faster socket I/O for asyncpg, Redis, gRPC and HTTP
+    uvloop.run(_main())
@@ -2,9 +2,9 @@
 
 from __future__ import annotations
 
-import json
 import logging
 
+import orjson
 import redis.asyncio as aioredis
 
 import config
@@ -17,12 +17,35 @@ _client: aioredis.Redis | None = None
 def get_client() -> aioredis.Redis:
     global _client
     if _client is None:
-        _client = aioredis.from_url(config.REDIS_URL, decode_responses=True)
+        # Only writes pre-encoded orjson bytes, so no response decoding needed.
+        # Created lazily from a handler, so the pool binds to the server's loop.
+        pool = aioredis.BlockingConnectionPool.from_url(
+            config.REDIS_URL,
+            max_connections=config.REDIS_POOL_SIZE,
+            socket_keepalive=True,
+            health_check_interval=30,
+        )
+        _client = aioredis.Redis(connection_pool=pool)
     return _client
 
 
 async def publish(channel: str, payload: dict) -> None:
     try:
-        await get_client().publish(channel, json.dumps(payload))
+        await get_client().publish(channel, orjson.dumps(payload))
     except Exception as exc:
         logger.warning("Redis publish failed channel=%s err=%s", channel, exc)
+
+
+async def enqueue(stream: str, payload: dict) -> bool:
+    """XADD a command to a stream consumed by a consumer group (capped at ~10k entries).
+
+    Returns False if the command could not be added.
+    """
+    try:
+        await get_client().xadd(
+            stream, {"payload": orjson.dumps(payload)}, maxlen=10000, approximate=True
+        )
+    except Exception as exc:
+        logger.warning("Redis enqueue failed stream=%s err=%s", stream, exc)
+        return False
+    return True
@@ -97,7 +97,7 @@ func (s *Service) GetApplication(ctx context.Context, userID, appID string) (*Ap
 }
 
 // CreateApplication inserts a new application at TO_APPLY status for the given job feed entry.
-// It then publishes CMD_ANALYZE_JOB to kick off the AI Coach pipeline.
+// It then enqueues CMD_ANALYZE_JOB to kick off the AI Coach pipeline.
 func (s *Service) CreateApplication(ctx context.Context, userID, jobFeedID string) (*Application, error) {
 	var a Application
 	err := s.pool.QueryRow(ctx,
@@ -124,15 +124,21 @@ func (s *Service) CreateApplication(ctx context.Context, userID, jobFeedID strin
 		return nil, fmt.Errorf("createApplication: %w", err)
 	}
 
-	// Publish CMD_ANALYZE_JOB so the AI Coach scores this application (non-fatal).
+	// Enqueue CMD_ANALYZE_JOB on its Redis Stream so the AI Coach scores this
+	// application even if it is restarting right now (non-fatal).
 	event, _ := json.Marshal(map[string]string{
 		"type":          "CMD_ANALYZE_JOB",
 		"applicationId": a.ID,
 		"jobFeedId":     jobFeedID,
 		"userId":        userID,
 	})
-	if err := s.rdb.Publish(ctx, "CMD_ANALYZE_JOB", event).Err(); err != nil {
-		slog.Warn("publish CMD_ANALYZE_JOB failed", "err", err)
+	if err := s.rdb.XAdd(ctx, &redis.XAddArgs{
+		Stream: "CMD_ANALYZE_JOB",
+		MaxLen: 10000,
+		Approx: true,
+		Values: map[string]any{"payload": event},
+	}).Err(); err != nil {
+		slog.Warn("enqueue CMD_ANALYZE_JOB failed", "err", err)
 	}
 
 	return &a, nil
@@ -45,7 +45,7 @@ type TrackerServiceClient interface {
 	// Fetch a single application by ID. Ownership is verified.
 	GetApplication(ctx context.Context, in *GetApplicationRequest, opts ...grpc.CallOption) (*ApplicationProto, error)
 	// Create a new application from an approved job_feed entry.
-	// Publishes CMD_ANALYZE_JOB to Redis after creation.
+	// Enqueues CMD_ANALYZE_JOB on its Redis Stream after creation.
 	CreateApplication(ctx context.Context, in *CreateApplicationRequest, opts ...grpc.CallOption) (*ApplicationProto, error)
 	// Move a Kanban card to a new status (state machine validated).
 	// On HIRED: archives the parent search_config (sets is_active=false, completed_at=NOW()).
@@ -153,7 +153,7 @@ type TrackerServiceServer interface {
 	// Fetch a single application by ID. Ownership is verified.
 	GetApplication(context.Context, *GetApplicationRequest) (*ApplicationProto, error)
 	// Create a new application from an approved job_feed entry.
-	// Publishes CMD_ANALYZE_JOB to Redis after creation.
+	// Enqueues CMD_ANALYZE_JOB on its Redis Stream after creation.
 	CreateApplication(context.Context, *CreateApplicationRequest) (*ApplicationProto, error)
 	// Move a Kanban card to a new status (state machine validated).
 	// On HIRED: archives the parent search_config (sets is_active=false, completed_at=NOW()).